@@ -1,14 +1,25 @@
+import time
+# istante di avvio, per misurare il tempo al primo frame
+STARTED = time.perf_counter()
+import os
 import sys
+import json
 import typing
-import uuid
+import argparse
+import itertools
+import contextlib
+import struct
+import math
+from decimal import Decimal, Context, localcontext
 from PyQt5 import QtCore
-from PyQt5.QtCore import Qt, QRect, QPointF, QRectF, QLineF, QRegExp
-from PyQt5.QtGui import QPicture, QPainter,QFont, QPen, QBrush, QPolygonF, QColor, QPainterPath, QIntValidator, QDoubleValidator, QKeySequence, QTextOption, QLinearGradient
-from PyQt5.QtWidgets import *
-import pyqtgraph as pg
+from PyQt5.QtCore import Qt, QPointF, QTimer
+from PyQt5.QtGui import QPalette, QPainter, QRegion, QColor, QCursor, QDoubleValidator, QKeySequence
+from PyQt5.QtWidgets import (QAbstractItemView, QAction, QApplication, QCheckBox, QComboBox, QDialog,
+                             QDialogButtonBox, QDockWidget, QFileDialog, QFormLayout, QFrame, QHBoxLayout, QLabel, QLineEdit,
+                             QListView, QMainWindow, QMessageBox, QShortcut, QSlider, QSpinBox, QStyle,
+                             QStyledItemDelegate, QToolBar, QToolButton, QToolTip, QVBoxLayout, QWidget)
 from enum import Enum
 from functools import *
-import qdarktheme
 from math import sqrt, pow, sin, cos, acos, degrees, radians, asin, pi
 
 class GeometryType(Enum):
@@ -30,132 +41,48 @@ class ErrorCode:
     INFINITE_TRIANGLES = 6
     IMPOSSIBLE_CONSTRUCTION = 7
 
+class GeometrySnapshot(typing.NamedTuple):
+    uid: int
+    type: GeometryType
+    name: str
+    value: float
+    static: bool
+    between: bool
+
 class Geometry():
+    # identificativi interi progressivi: unici nella sessione e senza una stringa per parametro
+    ids = itertools.count()
+
     def __init__(self, type: GeometryType , name, value):
         self.type = type
-        self.uid = str(uuid.uuid4())
+        self.uid = next(Geometry.ids)
         self.value = value
-        self.name = name
+        # i nomi sono pochi ("a", "alfa", ...): una sola copia di ciascuno
+        self.name = sys.intern(name)
         self.static = False
         self.between = False
-    
-class Triangle(pg.GraphicsObject):
-    def __init__(self, x1, y1, x2, y2, x3, y3, alfa, beta, gamma, color, *args):
-        super().__init__()
-        self.pen = QPen()
-        self.pen.setWidthF(0.1)
-        self.pen.setJoinStyle(Qt.MiterJoin)
-        self.pen.setCapStyle(Qt.PenCapStyle.RoundCap)
-        self.picture = QPicture()
-        self.painter = QPainter(self.picture)
-        if len(args) > 0:
-            self.triangle = QPolygonF([QPointF(x1, y1,),QPointF(x2, y2,), QPointF(x3, y3,) ])
-            self.brush = QBrush(color)
-            self.painter.setPen(self.pen)
-            self.painter.setBrush(self.brush)
-            self.painter.drawPolygon(self.triangle, Qt.WindingFill)
-            self.painter.end()
-        else:   
-            self.painter.scale(1,-1)
-
-            # draw angles        
-            self.drawAngle(0,0, 3, 0, alfa, QColor(0,100,0,100))
-            self.drawAngle(x2, y2, 3, 180, -beta, QColor(0,0,255,100))
-            new_gamma = gamma
-            #if gamma > 90:
-            #    new_gamma = 90 + gamma
-            self.drawAngle(x3, y3, 3, -beta, -new_gamma, QColor(255,0,0,100))
+        self.frozen = None
 
-            
-            #self.drawText(x2, y2-1.5, "β")
-            #self.drawText(x3, y3+0.75, "γ")
-            
-            self.painter.setPen(Qt.black)
-            self.painter.setFont(QFont('Arial', 1))
-            
-            # draw text
-            self.drawText(x1, y1-1.5, "α")
-            self.drawText(x2, y2-1.5, "β")
-            self.drawText(x3, y3+0.75, "γ")
+    def snapshot(self):
+        # se la geometria non è cambiata si riusa lo stesso snapshot (condivisione strutturale)
+        frozen = self.frozen
+        if frozen is None or frozen.value != self.value or frozen.static != self.static or frozen.between != self.between:
+            self.frozen = GeometrySnapshot(self.uid, self.type, self.name, self.value, self.static, self.between)
+        return self.frozen
 
-            
-            ax = x3+(x2-x3)/2
-            ay = abs((y2-y3)/2)
-            self.drawText(ax+1, ay+1, "a")
-
-            bx = (x3-x1)/2
-            by = abs((y3-y1)/2)
-            self.drawText(bx-1, by+1, "b")
-        
-            cx = x2/2
-            cy = -1.5
-            self.drawText(cx-1, cy, "c")
-            
-            # setup paint options
-            self.brush = QBrush(color)
-            self.painter.scale(1,-1)
-            self.painter.setRenderHint(QPainter.Antialiasing)
-            self.painter.setBrush(self.brush)
-
-            # draw lines
-            # lato a
-            self.pen.setColor(Qt.red)
-            self.painter.setPen(self.pen)
-            self.painter.drawLine(QLineF(x1, y1, x2, y2))
-            # lato c
-            self.pen.setColor(Qt.darkGreen)
-            self.painter.setPen(self.pen)
-            self.painter.drawLine(QLineF(x2, y2, x3, y3))
-            # lato b
-            self.pen.setColor(Qt.blue)
-            self.painter.setPen(self.pen)
-            self.painter.drawLine(QLineF(x1, y1, x3, y3))
-            
-            # draw points
-            self.dotpen = QPen(Qt.black, 0.2 , Qt.DashDotLine, Qt.RoundCap, Qt.RoundJoin)
-            # punto A
-            self.dotpen.setColor(Qt.darkGreen)
-            self.painter.setPen(self.dotpen)         
-            self.painter.drawPoint(QPointF(x1, y1))
-            # punto B
-            self.dotpen.setColor(Qt.blue)
-            self.painter.setPen(self.dotpen)         
-            self.painter.drawPoint(QPointF(x2, y2))
-            # punto C
-            self.dotpen.setColor(Qt.red)
-            self.painter.setPen(self.dotpen)         
-            self.painter.drawPoint(QPointF(x3, y3))
-
-            self.painter.end()
-
-    def drawAngle(self, x, y, radius, startAngle, angle, color):
-        myBrush = QBrush()
-        myBrush.setColor(color)
-        myBrush.setStyle(Qt.SolidPattern)
-        myPen = QPen()
-        myPen.setColor(QColor(255,255,255,255))
-        startPoint = QPointF()
-        center = QPointF(0, 0)
-        myPath = QPainterPath()
-        myPath.moveTo(center)
-        myPath.arcTo(QRectF(-radius,-radius,radius*2, radius*2), startAngle,
-                    angle)
-        myPath.translate(x,-y)
-        myPen.setWidthF(0.01)
-        self.painter.setBrush(myBrush)
-        self.painter.setPen(myPen)
-        self.painter.drawPath(myPath)
-
-    def drawText(self, x, y, text):
-        self.painter.drawText(QRectF(x-25, -y-25, 50, 50), text, QTextOption(Qt.AlignCenter))
-         
-    def paint(self, painter, option, widget=None):
-        painter.drawPicture(0, 0, self.picture)
-
-    def boundingRect(self):
-        bounds = self.picture.boundingRect()
-        return QRectF(bounds.x()-19, bounds.y()-19, bounds.width()+40, bounds.height()+40)
+    def restore(self, snapshot):
+        self.value = snapshot.value
+        self.static = snapshot.static
+        self.between = snapshot.between
+        self.frozen = snapshot
 
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        geometry = cls(snapshot.type, snapshot.name, snapshot.value)
+        geometry.uid = snapshot.uid
+        geometry.restore(snapshot)
+        return geometry
+    
 class Helper():
     def __init__(self, *args, **kwargs):
         self.lightblue = QColor(173, 216, 230, 120)
@@ -168,88 +95,423 @@ class Helper():
         errorBox.setText(text)
         errorBox.exec_()
 
+class Recorder():
+    # registra le interazioni in un file JSON lines, una riga per evento
+    def __init__(self, path):
+        self.file = open(path, "w")
+        self.start = time.perf_counter()
+
+    def record(self, event, **data):
+        data["event"] = event
+        data["t"] = round(time.perf_counter() - self.start, 6)
+        self.file.write(json.dumps(data) + "\n")
+
+    def close(self):
+        self.file.close()
+
+class History():
+    # numero massimo di passi conservati
+    LIMIT = 100000
+
+    def __init__(self, initial=()):
+        # ogni passo è una tupla di GeometrySnapshot immutabili
+        self.steps = [initial]
+        self.position = 0
+
+    def push(self, step):
+        if step == self.steps[self.position]:
+            return
+        del self.steps[self.position+1:]
+        self.steps.append(step)
+        if len(self.steps) > self.LIMIT*2:
+            del self.steps[:-self.LIMIT]
+        self.position = len(self.steps)-1
+
+    def can_undo(self):
+        return self.position > 0
+
+    def can_redo(self):
+        return self.position < len(self.steps)-1
+
+    def jump(self, position):
+        self.position = max(0, min(position, len(self.steps)-1))
+        return self.steps[self.position]
+
+class IllConditioned(Exception):
+    pass
+
+class FloatMath():
+    # aritmetica float per il percorso veloce. Con gli angoli sopra DEGENERATE (radianti)
+    # l'errore relativo dei risultati resta sotto ~eps/DEGENERATE**2, circa 2e-10;
+    # i casi più vicini al degenere vengono segnalati con IllConditioned
+    TOLERANCE = 1e-9
+    DEGENERATE = 1e-3
+    pi = math.pi
+    sin = math.sin
+    cos = math.cos
+    asin = math.asin
+    acos = math.acos
+    sqrt = math.sqrt
+    radians = math.radians
+    degrees = math.degrees
+
+    def scope(self):
+        return contextlib.nullcontext()
+
+    def number(self, x):
+        return float(x)
+
+    def result(self, x):
+        return x
+
+    def near(self, x, y):
+        if abs(x-y) <= self.TOLERANCE*max(abs(x), abs(y)):
+            raise IllConditioned()
+
+    def check(self, *angles):
+        if min(angles) < self.DEGENERATE:
+            raise IllConditioned()
+
+    def equal(self, x, y):
+        return x == y
+
+class PreciseMath():
+    # aritmetica decimal a DIGITS cifre, usata solo per i casi mal condizionati
+    DIGITS = 50
+
+    def __init__(self):
+        self.context = Context(prec=self.DIGITS)
+        self.epsilon = Decimal(10) ** (10-self.DIGITS)
+        with self.scope():
+            self.pi = self.compute_pi()
+
+    def scope(self):
+        return localcontext(self.context)
+
+    def number(self, x):
+        return Decimal(x)
+
+    def result(self, x):
+        return float(x)
+
+    def near(self, x, y):
+        pass
+
+    def check(self, *angles):
+        pass
+
+    def equal(self, x, y):
+        return abs(x-y) <= self.epsilon*max(1, abs(y))
+
+    def compute_pi(self):
+        lasts, t, s, n, na, d, da = 0, Decimal(3), 3, 1, 0, 0, 24
+        while s != lasts:
+            lasts = s
+            n, na = n+na, na+8
+            d, da = d+da, da+32
+            t = (t * n) / d
+            s += t
+        return +s
+
+    def sin(self, x):
+        i, lasts, s, fact, num, sign = 1, 0, x, 1, x, 1
+        while s != lasts:
+            lasts = s
+            i += 2
+            fact *= i * (i-1)
+            num *= x * x
+            sign *= -1
+            s += num / fact * sign
+        return +s
+
+    def cos(self, x):
+        i, lasts, s, fact, num, sign = 0, 0, 1, 1, 1, 1
+        while s != lasts:
+            lasts = s
+            i += 2
+            fact *= i * (i-1)
+            num *= x * x
+            sign *= -1
+            s += num / fact * sign
+        return +s
+
+    def atan(self, x):
+        if x < 0:
+            return -self.atan(-x)
+        if x > 1:
+            return self.pi/2 - self.atan(1/x)
+        # riduzione dell'argomento: atan(x) = 2*atan(x/(1+sqrt(1+x^2)))
+        halvings = 0
+        while x > Decimal("0.1"):
+            x = x / (1 + (1 + x*x).sqrt())
+            halvings += 1
+        i, lasts, s, num, sign = 1, 0, x, x, 1
+        while s != lasts:
+            lasts = s
+            i += 2
+            num *= x * x
+            sign *= -1
+            s += num / i * sign
+        return s * 2**halvings
+
+    def asin(self, x):
+        if abs(x) > 1:
+            raise ValueError("math domain error")
+        if abs(x) == 1:
+            return self.pi/2 * x
+        return self.atan(x / (1 - x*x).sqrt())
+
+    def acos(self, x):
+        return self.pi/2 - self.asin(x)
+
+    def sqrt(self, x):
+        return x.sqrt()
+
+    def radians(self, x):
+        return x * self.pi / 180
+
+    def degrees(self, x):
+        return x * 180 / self.pi
+
 class Resolver():
+    SIDES = ["a", "b", "c"]
+    ANGLES = ["alfa", "beta", "gamma"]
+
     def __init__(self, helper):
         self.helper = helper
+        self.fast = FloatMath()
+        self.precise = PreciseMath()
+
+    def adaptive(self, solver, *args):
+        # prima in float; solo se il caso è mal condizionato si ripete in precisione estesa
+        try:
+            return solver(self.fast, *args)
+        except IllConditioned:
+            with self.precise.scope():
+                return solver(self.precise, *args)
+
+    def batch(self, method, rows):
+        # risolve molte righe con lo stesso metodo, None per quelle impossibili
+        output = []
+        for row in rows:
+            try:
+                output.append(method(*row))
+            except Exception:
+                output.append(None)
+        return output
+
+    def LLL_batch(self, a, b, c):
+        # versione vettoriale di LLL: restituisce un array (n, 3) di angoli, NaN se impossibile
+        import numpy as np
+        a, b, c = (np.asarray(x, dtype=float) for x in (a, b, c))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            angles = np.degrees(np.arccos(np.stack([
+                (b*b + c*c - a*a)/(2*b*c),
+                (a*a + c*c - b*b)/(2*a*c),
+                (a*a + b*b - c*c)/(2*a*b)], axis=1)))
+            slack = np.minimum(np.minimum(b+c-a, a+c-b), a+b-c)
+            longest = np.maximum(np.maximum(a, b), c)
+            # solo le righe vicine al degenere ripassano dal percorso scalare: quelle che violano
+            # nettamente la disuguaglianza triangolare o non sono finite sono impossibili e basta
+            near = np.abs(slack) <= FloatMath.TOLERANCE*longest
+            valid = slack > FloatMath.TOLERANCE*longest
+            ill = near | (valid & ~(np.radians(angles.min(axis=1)) >= FloatMath.DEGENERATE))
+        angles[~valid & ~near] = np.nan
+        for i in np.flatnonzero(ill):
+            try:
+                angles[i] = self.LLL(a[i], b[i], c[i])
+            except Exception:
+                angles[i] = np.nan
+        return angles
+
+    def solve(self, known):
+        # known: {nome: valore} dei parametri inseriti; restituisce [a, b, c, alfa, beta, gamma]
+        # (con due soluzioni possibili solo la prima)
+        sides = [name for name in self.SIDES if name in known]
+        angles = [name for name in self.ANGLES if name in known]
+        values = dict(known)
+        if len(sides) == 3:
+            values.update(zip(self.ANGLES, self.LLL(*(known[name] for name in self.SIDES))))
+        elif len(sides) == 2 and len(angles) == 1:
+            angle = angles[0]
+            opposite = self.SIDES[self.ANGLES.index(angle)]
+            if opposite in known:
+                # angolo opposto a un lato noto: LLA
+                other = sides[0] if sides[1] == opposite else sides[1]
+                output = self.LLA(known[opposite], known[other], known[angle])
+                if isinstance(output[0], tuple):
+                    output = output[0]
+                third = [name for name in self.SIDES if name not in sides][0]
+                values[self.ANGLES[self.SIDES.index(other)]], values[self.ANGLES[self.SIDES.index(third)]], values[third] = output
+            else:
+                # angolo compreso tra i due lati: LAL
+                above, below = sides
+                values[opposite], values[self.ANGLES[self.SIDES.index(above)]], values[self.ANGLES[self.SIDES.index(below)]] = \
+                    self.LAL(known[above], known[angle], known[below])
+        elif len(sides) == 1 and len(angles) == 2:
+            # noti due angoli si ricava il terzo e si risolve con i due adiacenti al lato
+            side = sides[0]
+            opposite = self.ANGLES[self.SIDES.index(side)]
+            if opposite in known:
+                values[[name for name in self.ANGLES if name not in angles][0]] = 180 - sum(known[name] for name in angles)
+            first, second = [name for name in self.ANGLES if name != opposite]
+            values[opposite], values[self.SIDES[self.ANGLES.index(first)]], values[self.SIDES[self.ANGLES.index(second)]] = \
+                self.ALA(values[first], known[side], values[second])
+        elif len(angles) == 3:
+            raise Exception(ErrorCode.INFINITE_TRIANGLES)
+        else:
+            raise Exception(ErrorCode.INSUFFICIENT_PARAMETERS)
+        return [values[name] for name in self.SIDES + self.ANGLES]
+
+    def sweep(self, known, name, values):
+        # soluzioni al variare del parametro name: array (n, 6), NaN dove il triangolo è impossibile
+        import numpy as np
+        values = np.asarray(values, dtype=float)
+        if all(side in known for side in self.SIDES) and name in self.SIDES:
+            sides = np.array([np.full(len(values), float(known[side])) for side in self.SIDES])
+            sides[self.SIDES.index(name)] = values
+            return np.column_stack([sides.T, self.LLL_batch(*sides)])
+        rows = self.batch(lambda value: self.solve({**known, name: value}), [(value,) for value in values])
+        return np.array([row if row is not None else [np.nan]*6 for row in rows], dtype=float).reshape(-1, 6)
+
+    def vertices_batch(self, A, B, C):
+        # triangoli dati dai vertici (array (n, 2)): [a, b, c, alfa, beta, gamma] per riga, NaN se degeneri.
+        # gli angoli vengono da atan2(prodotto vettoriale, scalare), ben condizionato anche per i triangoli
+        # molto sottili che con il teorema del coseno finirebbero tutti in precisione estesa
+        import numpy as np
+        A, B, C = (np.asarray(x, dtype=float).reshape(-1, 2) for x in (A, B, C))
+
+        def angle(vertex, first, second):
+            u, v = first - vertex, second - vertex
+            return np.degrees(np.arctan2(np.abs(u[:, 0]*v[:, 1] - u[:, 1]*v[:, 0]), (u*v).sum(axis=1)))
+
+        solutions = np.column_stack([np.hypot(*(C - B).T), np.hypot(*(A - C).T), np.hypot(*(B - A).T),
+                                     angle(A, B, C), angle(B, C, A), angle(C, A, B)])
+        degenerate = (solutions[:, 3:] <= 0).any(axis=1)
+        solutions[degenerate, 3:] = np.nan
+        return solutions
 
     def LLL(self, a, b, c):
-        a,b,c = a, b, c
-        if a<b+c or b<a+c or c<a+b:    
+        return self.adaptive(self.LLL_with, a, b, c)
+
+    def LLL_with(self, m, a, b, c):
+        a, b, c = m.number(a), m.number(b), m.number(c)
+        m.near(a, b+c)
+        m.near(b, a+c)
+        m.near(c, a+b)
+        if a<b+c and b<a+c and c<a+b:    
             try:
-                alpha = degrees(acos((pow(a,2) - pow(b,2) - pow(c,2))/(-2*b*c)))
-                beta = degrees(acos((pow(b,2) - pow(a,2) - pow(c,2))/(-2*a*c)))
-                gamma = degrees(acos((pow(c,2) - pow(a,2) - pow(b,2))/(-2*a*b)))
-                return [alpha, beta, gamma]
+                alpha = m.acos((a*a - b*b - c*c)/(-2*b*c))
+                beta = m.acos((b*b - a*a - c*c)/(-2*a*c))
+                gamma = m.acos((c*c - a*a - b*b)/(-2*a*b))
             except Exception as error:
                 raise Exception(int(ErrorCode.INVALID_PARAMETERS)) from error
+            m.check(alpha, beta, gamma)
+            return [m.result(m.degrees(alpha)), m.result(m.degrees(beta)), m.result(m.degrees(gamma))]
         raise Exception(int(ErrorCode.TRIANGLE_INEQUALITY))
     
     def LAL(self, above, alfa, below):
+        return self.adaptive(self.LAL_with, above, alfa, below)
+
+    def LAL_with(self, m, above, alfa, below):
+        above, alfa, below = m.number(above), m.number(alfa), m.number(below)
+        if not 0 < alfa < 180 or above <= 0 or below <= 0:
+            raise Exception(int(ErrorCode.INVALID_PARAMETERS))
+        # con l'angolo compreso quasi nullo il lato opposto perde cifre: si decide in precisione estesa
+        m.check(m.radians(alfa))
         # calcolo lato mancante
-        opposite = sqrt(pow(above, 2)+pow(below,2) - 2*above*below*cos(radians(alfa)))
+        opposite = m.sqrt(above*above + below*below - 2*above*below*m.cos(m.radians(alfa)))
         # calcolo dei 2 angoli mancanti
-        beta = degrees(acos((pow(opposite, 2) + pow(below,2) - pow(above, 2))/(2*opposite*below)))
+        try:
+            beta = m.degrees(m.acos((opposite*opposite + below*below - above*above)/(2*opposite*below)))
+        except (ValueError, ArithmeticError) as error:
+            raise Exception(int(ErrorCode.INVALID_PARAMETERS)) from error
         gamma = 180 - alfa - beta        
-        return [opposite, beta, gamma]
+        m.check(m.radians(alfa), m.radians(beta), m.radians(gamma))
+        return [m.result(opposite), m.result(beta), m.result(gamma)]
 
     # l'angolo specificato è adiacente al secondo lato
     def LLA(self, a, b, alpha):
-        sin_beta = (b/a)*sin(radians(alpha))
-        alpha = radians(alpha)
+        return self.adaptive(self.LLA_with, a, b, alpha)
+
+    def LLA_with(self, m, a, b, alpha):
+        a, b = m.number(a), m.number(b)
+        alpha = m.radians(m.number(alpha))
+        sin_beta = (b/a)*m.sin(alpha)
+        # vicino all'angolo retto la classificazione si decide in precisione estesa
+        m.near(sin_beta, 1)
+        if m.equal(sin_beta, 1):
+            if alpha >= m.pi/2:        
+                raise Exception(ErrorCode.IMPOSSIBLE_CONSTRUCTION)
+            # 1 soluzione (triangolo rettangolo)
+            beta = m.pi/2
+            gamma = m.pi - beta - alpha
+            c = a * m.sin(gamma)/m.sin(alpha)
+            return [m.result(m.degrees(beta)), m.result(m.degrees(gamma)), m.result(c)]
         if sin_beta > 1:
             raise Exception(ErrorCode.IMPOSSIBLE_CONSTRUCTION)
-            
-        if sin_beta == 1:
-            if radians(alpha) >= pi/2:        
-                raise Exception(ErrorCode.IMPOSSIBLE_CONSTRUCTION)
-            # 1 soluzione
-            else:
-                beta = asin(sin_beta)
-                gamma = pi - beta - radians(alpha)
-                c = a * sin(gamma)/sin(alpha)
-                return [c, degrees(gamma), degrees(beta)]
         # fino a 2 possibili soluzioni
         elif sin_beta < 1 and sin_beta > 0:
-            beta = asin(sin_beta)
-            gamma = pi - beta - alpha            
+            beta = m.asin(sin_beta)
+            gamma = m.pi - beta - alpha            
             # 1 soluzione (angolo acuto) 
-            if alpha >= pi/2 or (alpha < pi/2 and b < a) or b == a:
-                gamma = pi - beta - alpha
-                c = a * sin(gamma)/sin(alpha)
-                return [degrees(beta), degrees(gamma), c]
+            if alpha >= m.pi/2 or (alpha < m.pi/2 and b < a) or b == a:
+                m.check(alpha, beta, gamma)
+                c = a * m.sin(gamma)/m.sin(alpha)
+                return [m.result(m.degrees(beta)), m.result(m.degrees(gamma)), m.result(c)]
             # 2 soluzioni
-            elif alpha < pi/2 and b > a:
-                beta2 = pi - beta
-                gamma2 = pi - beta2 - alpha
-                c1 = a * sin(gamma)/sin(alpha)
-                c2 = a * sin(gamma2)/sin(alpha)
-                return [(degrees(beta), degrees(gamma),c1), (degrees(beta2), degrees(gamma2), c2)]
+            elif alpha < m.pi/2 and b > a:
+                beta2 = m.pi - beta
+                gamma2 = m.pi - beta2 - alpha
+                m.check(alpha, beta, gamma, gamma2)
+                c1 = a * m.sin(gamma)/m.sin(alpha)
+                c2 = a * m.sin(gamma2)/m.sin(alpha)
+                return [(m.result(m.degrees(beta)), m.result(m.degrees(gamma)), m.result(c1)),
+                        (m.result(m.degrees(beta2)), m.result(m.degrees(gamma2)), m.result(c2))]
 
     def ALA(self, alfa, c, beta):
-        alfa = radians(alfa)
-        beta = radians(beta)
-        gamma = pi - alfa - beta
-        a = (sin(alfa) * c)/sin(gamma)
-        b = (sin(beta) * c)/sin(gamma)
-        return [degrees(gamma), a, b]
+        return self.adaptive(self.ALA_with, alfa, c, beta)
+
+    def ALA_with(self, m, alfa, c, beta):
+        alfa, c, beta = m.number(alfa), m.number(c), m.number(beta)
+        # il terzo angolo si calcola in gradi, prima della conversione
+        m.near(alfa+beta, 180)
+        gamma = 180 - alfa - beta
+        if gamma <= 0:
+            raise Exception(int(ErrorCode.INVALID_ANGLES))
+        alfa, beta, gamma = m.radians(alfa), m.radians(beta), m.radians(gamma)
+        m.check(alfa, beta, gamma)
+        a = (m.sin(alfa) * c)/m.sin(gamma)
+        b = (m.sin(beta) * c)/m.sin(gamma)
+        return [m.result(m.degrees(gamma)), m.result(a), m.result(b)]
     
     def AAL(self, alfa, gamma, c):
-        alfa = radians(alfa)
-        gamma = radians(gamma)
-        beta = pi - alfa - gamma
-        b = (c/sin(gamma))*sin(beta)
-        a = (c/sin(gamma))*sin(alfa)
-        return [degrees(beta), a, b]
+        return self.adaptive(self.AAL_with, alfa, gamma, c)
+
+    def AAL_with(self, m, alfa, gamma, c):
+        alfa, gamma, c = m.number(alfa), m.number(gamma), m.number(c)
+        m.near(alfa+gamma, 180)
+        beta = 180 - alfa - gamma
+        if beta <= 0:
+            raise Exception(int(ErrorCode.INVALID_ANGLES))
+        alfa, beta, gamma = m.radians(alfa), m.radians(beta), m.radians(gamma)
+        m.check(alfa, beta, gamma)
+        b = (c/m.sin(gamma))*m.sin(beta)
+        a = (c/m.sin(gamma))*m.sin(alfa)
+        return [m.result(m.degrees(beta)), m.result(a), m.result(b)]
 
 class DockElement(QFrame):
+    ANGLE_NAMES = {"alfa": "α", "alfa2": "α2", "beta": "β", "beta2": "β2", "gamma": "γ", "gamma2": "γ2"}
 
-    def __init__(self, geometry, static):
-        super().__init__()
+    def __init__(self, static, parent=None):
+        super().__init__(parent)
         self.isStatic = static
-        self.geometry = geometry
-        self.checkbox = QCheckBox()
-        self.checkbox.setText("compreso tra gli altri 2")
+        self.geometry = None
+        self.color = None
         self.setFrameShape(QFrame.StyledPanel)
+        # stesso sfondo sia come editor nella vista che come template
+        self.setBackgroundRole(QPalette.Window)
+        self.setAutoFillBackground(True)
         self.hbox = QHBoxLayout()
         self.button = QToolButton()
         self.icon = self.style().standardIcon(QStyle.SP_BrowserStop)
@@ -266,74 +528,237 @@ class DockElement(QFrame):
         self.labelBox.addWidget(self.valueLabel)
         self.vbox.addLayout(self.labelBox)
         self.hbox.addLayout(self.vbox)
+        if self.isStatic != True:
+            self.slider = QSlider(Qt.Orientation.Horizontal)
+            self.slider.setSingleStep(1)
+            self.slider.valueChanged.connect(self.sliderValueChanged)
+            self.vbox.addWidget(self.slider)
+        self.checkbox = QCheckBox()
+        self.checkbox.setText("compreso tra gli altri 2")
+        self.checkbox.stateChanged.connect(self.update_geometry)
+        self.checkbox.hide()
+        self.vbox.addWidget(self.checkbox)
+
+    def bind(self, geometry, color):
+        # aggiorna la riga sul posto, senza ricreare i widget
+        self.geometry = geometry
         if geometry.type == GeometryType.ANGLE:
-            if geometry.name == "alfa":
-                name = "α"
-            elif geometry.name == "alfa2":
-                name = "α2"
-            elif geometry.name == "beta":
-                name = "β"
-            elif geometry.name == "beta2":
-                name = "β2"    
-            elif geometry.name == "gamma":
-                name = "γ"
-            elif geometry.name == "gamma2":
-                name = "γ2"
+            name = self.ANGLE_NAMES.get(geometry.name, geometry.name)
             self.textLabel.setText(f"Angolo {name}:")  
             self.valueLabel.setText("{:.1f}°".format(geometry.value))
         elif geometry.type == GeometryType.SIDE:
             self.textLabel.setText(f"Lato {geometry.name}:")
             self.valueLabel.setText("{:.1f}".format(geometry.value))
         if self.isStatic != True:
-            self.slider = QSlider(Qt.Orientation.Horizontal)
-            self.slider.setSingleStep(1)
+            self.slider.blockSignals(True)
             if geometry.type == GeometryType.SIDE:
                 self.slider.setRange(1, 1000)
             elif geometry.type == GeometryType.ANGLE:
                 self.slider.setRange(0, 1799)
             self.slider.setValue(int(geometry.value*10))
-            self.slider.valueChanged.connect(self.sliderValueChanged)
-            self.vbox.addWidget(self.slider)
+            self.slider.blockSignals(False)
+        self.checkbox.blockSignals(True)
+        self.checkbox.setVisible(geometry.between)
+        self.checkbox.setChecked(geometry.between)
+        self.checkbox.blockSignals(False)
+        if color != self.color:
+            self.color = color
+            # colore disegnato in paintEvent: un foglio di stile per riga verrebbe ricompilato a ogni cambio
+            self.update()
+
+    def paintEvent(self, event):
+        if self.color:
+            painter = QPainter(self)
+            painter.fillRect(self.rect(), self.color)
+            painter.end()
+        super().paintEvent(event)
 
     def sliderValueChanged(self, new):
+        win.record("slider", row=win.triangle.index(self.geometry), value=new)
         self.geometry.value = float(new/10)
-        if self.geometry.type == GeometryType.ANGLE:
-            self.valueLabel.setText("{:.1f}°".format(float(new/10)))
-        else:
-            self.valueLabel.setText("{:.1f}".format(float(new/10)))
-        win.graphWidget.removeItem(win.graph_triangle)
-        if win.second_triangle:
-            win.graphWidget.removeItem(win.second_triangle) 
+        win.model.refresh(self.geometry)
+        win.graph_triangle = win.release(win.graph_triangle)
+        win.second_triangle = win.release(win.second_triangle)
         try:
             params = win.calculate_triangle()
-            self.setStyleSheet(f"background-color: rgb(255, 255, 255);")
+            win.model.set_highlight(self.geometry, None)
             win.draw_triangle(*params) 
             win.errorLabel.setText("")
         except Exception as error:
             code = int(error.args[0])
-            if code == int(ErrorCode.INSUFFICIENT_PARAMETERS):
-                return
-            self.setStyleSheet(f"background-color: lightcoral;")
-            win.handle_error(code)
+            if code != int(ErrorCode.INSUFFICIENT_PARAMETERS):
+                win.model.set_highlight(self.geometry, QColor("lightcoral"))
+                win.handle_error(code)
+        win.record_history()
 
     def update_geometry(self, x):
+        win.record("between", row=win.triangle.index(self.geometry), state=x)
         if x==2:
             self.geometry.between = True
         elif x==0:
             self.geometry.between = False
+        win.model.refresh(self.geometry, Qt.SizeHintRole)
+        win.record_history()
+
+class ParameterModel(QtCore.QAbstractListModel):
+    def __init__(self, geometries, parent=None):
+        super().__init__(parent)
+        # la lista è condivisa con Window.triangle
+        self.geometries = geometries
+        self.highlights = {}
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.geometries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        geometry = self.geometries[index.row()]
+        if role == Qt.UserRole:
+            return geometry
+        if role == Qt.DisplayRole:
+            return geometry.name
+        if role == Qt.BackgroundRole:
+            return self.highlights.get(geometry.uid)
+        return None
+
+    def append(self, geometry):
+        row = len(self.geometries)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.geometries.append(geometry)
+        self.endInsertRows()
+
+    def remove(self, geometry):
+        row = self.geometries.index(geometry)
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.geometries[row]
+        self.highlights.pop(geometry.uid, None)
+        self.endRemoveRows()
+
+    def clear(self):
+        self.replace([])
+
+    def replace(self, geometries):
+        self.beginResetModel()
+        self.geometries[:] = geometries
+        self.highlights.clear()
+        self.endResetModel()
+
+    def refresh(self, geometry, *roles):
+        index = self.index(self.geometries.index(geometry))
+        self.dataChanged.emit(index, index, list(roles))
+
+    def refresh_all(self):
+        if len(self.geometries) > 0:
+            self.dataChanged.emit(self.index(0), self.index(len(self.geometries)-1), [Qt.SizeHintRole])
+
+    def set_highlight(self, geometry, color):
+        if self.highlights.get(geometry.uid) == color:
+            return
+        if color is None:
+            del self.highlights[geometry.uid]
+        else:
+            self.highlights[geometry.uid] = color
+        self.refresh(geometry, Qt.BackgroundRole)
+
+    def clear_highlights(self):
+        self.highlights.clear()
+        self.refresh_all()
+
+class ParameterDelegate(QStyledItemDelegate):
+    removeRequested = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # un DockElement di riferimento per tipo di riga, usato solo per disegnare
+        self.templates = {}
+        # editor chiusi, per tipo di riga: vengono riaperti invece di crearne di nuovi
+        self.pool = {False: [], True: []}
+
+    def template(self, index):
+        geometry = index.data(Qt.UserRole)
+        if geometry.static not in self.templates:
+            self.templates[geometry.static] = DockElement(geometry.static)
+        template = self.templates[geometry.static]
+        template.bind(geometry, index.data(Qt.BackgroundRole))
+        template.layout().activate()
+        return template
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(option.rect.width(), self.template(index).sizeHint().height())
 
-    def updateUI(self):
-        if self.checkbox != None:
-            self.vbox.removeWidget(self.checkbox)
-            self.checkbox.deleteLater()
-            self.checkbox = None
-
-        if self.geometry.between:
-            self.checkbox = QCheckBox()
-            self.checkbox.setText("compreso tra gli altri 2")
-            self.vbox.addWidget(self.checkbox)
-            self.checkbox.stateChanged.connect(self.update_geometry)
-            self.checkbox.setChecked(self.geometry.between)
+    def paint(self, painter, option, index):
+        # solo le righe visibili arrivano qui: si disegna il template senza creare widget
+        template = self.template(index)
+        template.resize(option.rect.size())
+        painter.save()
+        painter.translate(option.rect.topLeft())
+        template.render(painter, QtCore.QPoint(), QRegion(), QWidget.DrawWindowBackground | QWidget.DrawChildren)
+        painter.restore()
+
+    def createEditor(self, parent, option, index):
+        geometry = index.data(Qt.UserRole)
+        pool = self.pool[geometry.static]
+        if pool:
+            editor = pool.pop()
+            if editor.parent() is not parent:
+                editor.setParent(parent)
+            editor.show()
+            return editor
+        editor = DockElement(geometry.static, parent)
+        # collegato una volta sola: la Geometry è quella legata all'editor nel momento del clic
+        editor.button.clicked.connect(partial(self.remove, editor))
+        return editor
+
+    def remove(self, editor):
+        self.removeRequested.emit(editor.geometry)
+
+    def destroyEditor(self, editor, index):
+        # l'editor non viene distrutto ma nascosto e tenuto per la prossima riga
+        editor.hide()
+        editor.geometry = None
+        self.pool[editor.isStatic].append(editor)
+
+    def setEditorData(self, editor, index):
+        editor.bind(index.data(Qt.UserRole), index.data(Qt.BackgroundRole))
+
+    def setModelData(self, editor, model, index):
+        # il DockElement modifica direttamente la Geometry
+        pass
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+class ParameterView(QListView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setResizeMode(QListView.Adjust)
+        self.hovered = QtCore.QPersistentModelIndex()
+        self.entered.connect(self.open_editor)
+
+    def setModel(self, model):
+        self.hovered = QtCore.QPersistentModelIndex()
+        super().setModel(model)
+
+    def open_editor(self, index):
+        # un solo editor interattivo alla volta, sulla riga sotto il mouse
+        if self.hovered == QtCore.QPersistentModelIndex(index):
+            return
+        if self.hovered.isValid():
+            self.closePersistentEditor(QtCore.QModelIndex(self.hovered))
+        self.hovered = QtCore.QPersistentModelIndex(index)
+        self.openPersistentEditor(index)
+
+    def dataChanged(self, topLeft, bottomRight, roles=[]):
+        super().dataChanged(topLeft, bottomRight, roles)
+        if Qt.SizeHintRole in roles:
+            self.scheduleDelayedItemsLayout()
             
 class AddParameterDialog(QDialog):
     def __init__(self, type):
@@ -380,15 +805,145 @@ class AddParameterDialog(QDialog):
         #self.mainLayout.addWidget(self.checkbox)
         self.setLayout(self.mainLayout)
 
+class PlaybackDialog(QDialog):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Anima un parametro")
+        self.buttonBox = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.buttonBox.rejected.connect(self.reject)
+        self.comboBox = QComboBox()
+        self.startInput = QLineEdit()
+        self.startInput.setValidator(QDoubleValidator())
+        self.endInput = QLineEdit()
+        self.endInput.setValidator(QDoubleValidator())
+        self.framesInput = QSpinBox()
+        self.framesInput.setRange(2, 100000)
+        self.framesInput.setValue(120)
+        self.fpsInput = QSpinBox()
+        self.fpsInput.setRange(1, 240)
+        self.fpsInput.setValue(60)
+        self.exportCheckbox = QCheckBox("Esporta i fotogrammi")
+        self.formLayout = QFormLayout()
+        self.formLayout.addRow("Parametro", self.comboBox)
+        self.formLayout.addRow("Da", self.startInput)
+        self.formLayout.addRow("A", self.endInput)
+        self.formLayout.addRow("Fotogrammi", self.framesInput)
+        self.formLayout.addRow("Fotogrammi al secondo", self.fpsInput)
+        self.formLayout.addRow(self.exportCheckbox)
+        self.formLayout.addRow(self.buttonBox)
+        self.setLayout(self.formLayout)
+
+class TriangleState():
+    # parametri, modello del dock e item grafici di un singolo triangolo del workspace
+    def __init__(self, name, position):
+        self.name = name
+        self.position = position
+        self.triangle = []
+        self.model = ParameterModel(self.triangle)
+        self.graph_triangle = None
+        self.second_triangle = None
+        self.history = History()
+        # ultima soluzione disegnata [a, b, c, alfa, beta, gamma] e triangoli simili mostrati
+        self.solution = None
+        self.matches = []
+        # da scrivere al prossimo salvataggio della sessione
+        self.dirty = True
+
+    def entry(self):
+        geometries = [(geometry.type.value, geometry.name, geometry.value, geometry.static, geometry.between) for geometry in self.triangle]
+        return (self.name, (self.position.x(), self.position.y()), geometries, self.solution)
+
+    @classmethod
+    def from_entry(cls, entry):
+        name, position, geometries, solution = entry
+        state = cls(name, QPointF(*position))
+        for type, geometry_name, value, static, between in geometries:
+            geometry = Geometry(GeometryType(type), geometry_name, value)
+            geometry.static = static
+            geometry.between = between
+            state.triangle.append(geometry)
+        state.solution = solution
+        state.history = History(tuple(geometry.snapshot() for geometry in state.triangle))
+        state.dirty = False
+        return state
+
+class Workspace(QtCore.QAbstractListModel):
+    # triangoli del workspace: quelli letti da una sessione restano None finché non vengono selezionati
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.states = []
+        self.session = None
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.states)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        state = self.states[index.row()]
+        if state is None:
+            return self.session.name(index.row())
+        return state.name
+
+    def __len__(self):
+        return len(self.states)
+
+    def __getitem__(self, i):
+        if self.states[i] is None:
+            self.states[i] = TriangleState.from_entry(self.session.read(i))
+        return self.states[i]
+
+    def loaded(self):
+        return [state for state in self.states if state is not None]
+
+    def append(self, state):
+        row = len(self.states)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.states.append(state)
+        self.endInsertRows()
+
+    def open(self, session):
+        self.beginResetModel()
+        if self.session is not None:
+            self.session.close()
+        self.session = session
+        self.states = [None]*len(session)
+        self.endResetModel()
+
+    def save(self, session):
+        # si scrivono solo i triangoli nuovi o modificati dall'ultimo salvataggio
+        if self.session is not session:
+            self.session = session
+        entries = {i: state.entry() for i, state in enumerate(self.states) if state is not None and state.dirty}
+        session.write(entries)
+        for i in entries:
+            self.states[i].dirty = False
+
 class Window(QMainWindow):
+    firstFrame = QtCore.pyqtSignal()
+    plotReady = QtCore.pyqtSignal()
+    # distanza orizzontale tra i triangoli del workspace
+    WORKSPACE_GAP = 5
+    # larghezza riservata a un triangolo non ancora risolto, come quello di esempio
+    PLACEHOLDER_WIDTH = 10
+    # item dei triangoli tenuti da parte per essere riutilizzati
+    POOL_LIMIT = 32
+    # quanti triangoli simili mostrare
+    SIMILAR_COUNT = 5
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.triangle = []
+        self.workspace = Workspace(self)
+        self.state = TriangleState("Triangolo 1", QPointF(0, 0))
+        self.workspace.append(self.state)
         self.is_check = False
         self.helper = Helper()
+        self.recorder = None
+        self.library_path = "libreria.npz"
+        self.library = None
         self.can_update = False
-        self.second_triangle = None
         self.resolver = Resolver(self.helper)
         self.setWindowTitle("Risolutore di triangoli")
         self.setGeometry(0,0,720, 480)
@@ -396,29 +951,261 @@ class Window(QMainWindow):
         self.createActions()
         self.createToolBar()
         self.connectActions()
-        self.draw_triangle(10, 10, 10, 60, 60, 60)
+        self.dialogs = {}
+        self.playback = None
+        self.polygon = None
+        # item dei triangoli non più nel grafico, pronti per essere riutilizzati
+        self.pool = []
+        self.painted = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        # il grafico viene costruito subito dopo il primo frame
+        if not self.painted:
+            self.painted = True
+            QTimer.singleShot(0, self.firstFrame.emit)
+            QTimer.singleShot(0, self.setupPlot)
+
+    # le proprietà seguenti si riferiscono sempre al triangolo selezionato
+    @property
+    def triangle(self):
+        return self.state.triangle
+
+    @property
+    def model(self):
+        return self.state.model
+
+    @property
+    def graph_triangle(self):
+        return self.state.graph_triangle
+
+    @graph_triangle.setter
+    def graph_triangle(self, item):
+        self.state.graph_triangle = item
+        # senza item principale non c'è una soluzione valida da salvare o aggiungere alla libreria
+        if item is None:
+            self.state.solution = None
+
+    @property
+    def second_triangle(self):
+        return self.state.second_triangle
+
+    @second_triangle.setter
+    def second_triangle(self, item):
+        self.state.second_triangle = item
+
+    def record(self, event, **data):
+        if self.recorder is not None:
+            self.recorder.record(event, **data)
+
+    def load_library(self):
+        # la libreria viene caricata solo al primo utilizzo
+        from similarity import ShapeIndex
+        if self.library is None:
+            try:
+                self.library = ShapeIndex.load(self.library_path)
+            except FileNotFoundError:
+                self.library = ShapeIndex([])
+        return self.library
 
+    def add_to_library(self):
+        if self.state.solution is None:
+            return
+        self.record("library")
+        self.library = self.load_library().extended([self.state.solution])
+        # finché le aggiunte restano in coda si riscrive solo il file della coda
+        if self.library.tail() > 0:
+            self.library.save_tail(self.library_path)
+        else:
+            self.library.save(self.library_path)
+
+    def find_similar(self):
+        if self.state.solution is None:
+            return
+        self.record("similar", scale=self.scaleAction.isChecked())
+        library = self.load_library()
+        scale = 1.0 if self.scaleAction.isChecked() else 0.0
+        rows = [row for distance, row in library.nearest(self.state.solution, self.SIMILAR_COUNT, scale)]
+        self.show_matches(library.triangles[rows])
+
+    def show_matches(self, triangles):
+        # i triangoli simili vengono disegnati in fila sopra quello selezionato
+        for item in self.state.matches:
+            self.release(item)
+        self.state.matches = []
+        a, b, c, alfa, beta, gamma = self.state.solution
+        perimeter = a + b + c
+        x = self.state.position.x()
+        y = self.state.position.y() + sin(radians(alfa))*b + self.WORKSPACE_GAP
+        # posizioni degli angoli del triangolo corrente dal più piccolo al più grande
+        ranks = sorted(range(3), key=lambda i: (alfa, beta, gamma)[i])
+        for match in triangles:
+            # si rinominano i vertici del simile perché gli angoli abbiano lo stesso ordine del corrente
+            order = sorted(range(3), key=lambda i: match[3+i])
+            relabeled = [0]*6
+            for rank, i in zip(ranks, order):
+                relabeled[rank] = match[i]
+                relabeled[3+rank] = match[3+i]
+            ma, mb, mc, malfa, mbeta, mgamma = relabeled
+            # senza la scala si confronta solo la forma: stesso perimetro del triangolo corrente
+            ratio = 1 if self.scaleAction.isChecked() else perimeter/(ma + mb + mc)
+            mb, mc = mb*ratio, mc*ratio
+            item = self.acquire(0, 0, mc, 0, cos(radians(malfa))*mb, sin(radians(malfa))*mb, malfa, mbeta, mgamma, self.helper.lightcoral, 1)
+            item.setPos(QPointF(x, y))
+            self.state.matches.append(item)
+            x += item.boundingRect().right() + self.WORKSPACE_GAP
+
+    def new_triangle(self):
+        self.record("new")
+        # il nuovo triangolo viene affiancato a destra dell'ultimo del workspace, anche se non è ancora disegnato
+        last = self.workspace[len(self.workspace)-1]
+        _, right = self.extent(last)
+        state = TriangleState(f"Triangolo {len(self.workspace)+1}", QPointF(last.position.x() + right + self.WORKSPACE_GAP, 0))
+        self.workspace.append(state)
+        # la selezione fa parte dell'evento "new": non viene registrata come "select"
+        self.triangleSelector.blockSignals(True)
+        self.triangleSelector.setCurrentIndex(len(self.workspace)-1)
+        self.triangleSelector.blockSignals(False)
+        self.show_triangle(len(self.workspace)-1)
+
+    def extent(self, state):
+        # estensione orizzontale del triangolo rispetto alla sua posizione: dagli item se è disegnato,
+        # altrimenti dalla soluzione salvata, altrimenti lo spazio del triangolo di esempio
+        items = [item for item in (state.graph_triangle, state.second_triangle) if item is not None]
+        if items:
+            rects = [item.boundingRect() for item in items]
+            return min(rect.left() for rect in rects), max(rect.right() for rect in rects)
+        if state.solution is not None:
+            a, b, c, alfa, beta, gamma = state.solution
+            x = cos(radians(alfa))*b
+            return min(0, x), max(c, x)
+        return 0, self.PLACEHOLDER_WIDTH
+
+    def layout_workspace(self, start):
+        # sposta a destra i triangoli che dopo start si sovrappongono al precedente; ci si ferma al primo
+        # che non serve spostare, perché quelli successivi erano già disposti in fila
+        for i in range(max(start, 1), len(self.workspace)):
+            previous, state = self.workspace[i-1], self.workspace[i]
+            left, _ = self.extent(state)
+            x = previous.position.x() + self.extent(previous)[1] + self.WORKSPACE_GAP - left
+            if state.position.x() >= x and i > start:
+                break
+            if state.position.x() >= x:
+                continue
+            dx = x - state.position.x()
+            state.position = QPointF(x, state.position.y())
+            for item in [state.graph_triangle, state.second_triangle] + state.matches:
+                if item is not None:
+                    item.moveBy(dx, 0)
+            state.dirty = True
+
+    def select_triangle(self, i):
+        if i < 0:
+            return
+        self.record("select", index=i)
+        self.show_triangle(i)
+
+    def show_triangle(self, i):
+        self.state = self.workspace[i]
+        self.parameterView.setModel(self.model)
+        self.errorLabel.setText("")
+        # un triangolo appena letto dalla sessione viene disegnato alla prima selezione
+        if self.graph_triangle is None:
+            self.redraw_triangle()
+        self.update_toolbar()
+        self.update_history_actions()
+
+    def open_session(self, path=None):
+        from session import SessionFile
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, "Apri sessione", "", "Sessioni (*.tris)")
+            if not path:
+                return
+        # il file viene verificato prima di toccare il workspace: se non è valido resta tutto com'è
+        try:
+            session = SessionFile(path)
+        except (ValueError, struct.error, OSError) as error:
+            self.errorLabel.setText(f"Sessione non valida: {error}")
+            return
+        self.record("open", path=path)
+        for state in self.workspace.loaded():
+            for item in [state.graph_triangle, state.second_triangle] + state.matches:
+                self.release(item)
+            state.graph_triangle = state.second_triangle = None
+            state.matches = []
+        # il reset del modello cambia l'indice della combo: niente select_triangle durante l'apertura
+        self.triangleSelector.blockSignals(True)
+        self.workspace.open(session)
+        if len(self.workspace) == 0:
+            self.workspace.append(TriangleState("Triangolo 1", QPointF(0, 0)))
+        self.triangleSelector.setCurrentIndex(0)
+        self.triangleSelector.blockSignals(False)
+        # selezione interna, già implicita nell'evento "open" registrato
+        self.show_triangle(0)
+
+    def save_session(self):
+        from session import SessionFile
+        session = self.workspace.session
+        if session is None:
+            path, _ = QFileDialog.getSaveFileName(self, "Salva sessione", "", "Sessioni (*.tris)")
+            if not path:
+                return
+            if os.path.exists(path):
+                os.remove(path)
+            session = SessionFile(path)
+        self.workspace.save(session)
+
+    def record_history(self):
+        self.state.history.push(tuple(geometry.snapshot() for geometry in self.triangle))
+        self.state.dirty = True
+        self.update_history_actions()
+
+    def update_history_actions(self):
+        self.undoAction.setEnabled(self.state.history.can_undo())
+        self.redoAction.setEnabled(self.state.history.can_redo())
+
+    def undo(self):
+        self.record("undo")
+        self.restore_history(self.state.history.position-1)
+
+    def redo(self):
+        self.record("redo")
+        self.restore_history(self.state.history.position+1)
+
+    def restore_history(self, position):
+        step = self.state.history.jump(position)
+        # le geometrie ancora presenti vengono riutilizzate, le altre ricreate dallo snapshot
+        existing = {geometry.uid: geometry for geometry in self.triangle}
+        geometries = []
+        for snapshot in step:
+            geometry = existing.get(snapshot.uid)
+            if geometry is None:
+                geometry = Geometry.from_snapshot(snapshot)
+            else:
+                geometry.restore(snapshot)
+            geometries.append(geometry)
+        self.model.replace(geometries)
+        self.state.dirty = True
+        self.errorLabel.setText("")
+        self.redraw_triangle()
+        self.update_toolbar()
+        self.update_history_actions()
+
+    def redraw_triangle(self):
+        self.graph_triangle = self.release(self.graph_triangle)
+        self.second_triangle = self.release(self.second_triangle)
+        # se il triangolo era risolto lo si ridisegna
+        if any(geometry.static for geometry in self.triangle):
+            try:
+                self.draw_triangle(*self.calculate_triangle())
+            except Exception as error:
+                self.handle_error(int(error.args[0]))
 
     def order_dock(self):
-        angle_elements = []
-        side_elements = []
-        for i in range(self.vLayout.count()-1):
-            myWidget = self.vLayout.itemAt(i).widget()
-            if myWidget.geometry.type == GeometryType.ANGLE:
-                angle_elements.append(myWidget)
-            elif myWidget.geometry.type == GeometryType.SIDE:
-                side_elements.append(myWidget)
-        new_elements = side_elements + angle_elements
-        for i in range(self.vLayout.count()-1):
-            myWidget = self.vLayout.itemAt(i).widget()
-            new_geometry = new_elements[i].geometry
-            new_text = new_elements[i].label.text()
-            myWidget.text = new_text
-            myWidget.new_geometry = new_geometry
-        for i in range(self.vLayout.count()-1):
-            myWidget = self.vLayout.itemAt(i).widget()
-            myWidget.label.setText(myWidget.text)
-            myWidget.geometry = myWidget.new_geometry
+        # prima i lati, poi gli angoli
+        self.model.layoutAboutToBeChanged.emit()
+        self.triangle.sort(key=lambda geometry: geometry.type != GeometryType.SIDE)
+        self.model.layoutChanged.emit()
     
     def update_toolbar(self):
         if len(self.triangle)==3:
@@ -447,14 +1234,43 @@ class Window(QMainWindow):
             self.toolBar.actions()[3].setDisabled(True)
     
     def draw_triangle(self, a, b, c, alfa, beta, gamma, *args):
+        self.createPlot()
         side_list = [geometry.value for geometry in self.triangle if geometry.type ==GeometryType.SIDE]
         angle_list = [geometry.value for geometry in self.triangle if geometry.type ==GeometryType.ANGLE]   
         if len(args) > 0:      
-            self.second_triangle = Triangle(0, 0, c, 0, cos(radians(alfa))*b, sin(radians(alfa))*b, alfa, beta, gamma, self.helper.lightyellow, 1)
-            self.graphWidget.addItem(self.second_triangle)
+            self.release(self.second_triangle)
+            self.second_triangle = self.acquire(0, 0, c, 0, cos(radians(alfa))*b, sin(radians(alfa))*b, alfa, beta, gamma, self.helper.lightyellow, 1)
+            self.second_triangle.setPos(self.state.position)
             return
-        self.graph_triangle = Triangle(0, 0, c, 0, cos(radians(alfa))*b, sin(radians(alfa))*b, alfa, beta, gamma, self.helper.lightblue)
-        self.graphWidget.addItem(self.graph_triangle)
+        self.state.solution = [a, b, c, alfa, beta, gamma]
+        self.release(self.graph_triangle)
+        self.graph_triangle = self.acquire(0, 0, c, 0, cos(radians(alfa))*b, sin(radians(alfa))*b, alfa, beta, gamma, self.helper.lightblue)
+        self.graph_triangle.setPos(self.state.position)
+        # le dimensioni del triangolo possono essere cambiate: i vicini vengono spostati se si sovrappongono
+        self.layout_workspace(self.triangleSelector.currentIndex())
+
+    def acquire(self, *args):
+        # ogni tick dello slider ridisegna un item già creato invece di allocare un nuovo Triangle con le sue QPicture
+        from plot import Triangle
+        if self.pool:
+            item = self.pool.pop()
+            item.build(*args)
+            item.show()
+            return item
+        item = Triangle(*args)
+        self.graphWidget.addItem(item)
+        return item
+
+    def release(self, item):
+        # l'item resta nella scena, nascosto, finché non serve per un altro triangolo: niente addItem/removeItem
+        # a ogni tick; restituisce None per azzerare il riferimento
+        if item is not None and item not in self.pool:
+            if len(self.pool) < self.POOL_LIMIT:
+                item.hide()
+                self.pool.append(item)
+            else:
+                self.graphWidget.removeItem(item)
+        return None
 
     def get_by_name(self, *args):
         output = []
@@ -472,15 +1288,14 @@ class Window(QMainWindow):
     
     def update_nonstatic_params(self, *args):
         nsplit = int(len(args)/2)
-        for i in range(self.vLayout.count()-1):
-            myWidget = self.vLayout.itemAt(i).widget()
-            found = False
+        for geometry in self.triangle:
+            if geometry.static:
+                continue
             for param, value in zip(args[:nsplit], args[nsplit:]):
-                if found:
-                    continue
-                if myWidget.geometry.name == param:
-                    found = True
-                    myWidget.slider.setValue(value) 
+                if geometry.name == param:
+                    geometry.value = float(value/10)
+                    self.model.refresh(geometry)
+                    break
             
     def get_geoms_by_type(self, type):
         output = [geometry for geometry in self.triangle if geometry.type == type and geometry.static != True]
@@ -712,9 +1527,9 @@ class Window(QMainWindow):
             self.errorLabel.setText("Parametri duplicati")
 
     def resolve_triangle(self):
+        self.record("resolve")
         self.errorLabel.setText("")
-        if self.graph_triangle != None:
-            self.graphWidget.removeItem(self.graph_triangle)
+        self.graph_triangle = self.release(self.graph_triangle)
         try:
             a, b, c, alfa, beta, gamma = self.calculate_triangle()
         except Exception as error:
@@ -722,77 +1537,65 @@ class Window(QMainWindow):
             self.handle_error(code)
             return
         self.draw_triangle(int(a), int(b), int(c), int(alfa), int(beta), int(gamma))
-        for i in range(self.vLayout.count()-1):
-            myWidget = self.vLayout.itemAt(i).widget()
-            myWidget.updateUI()
         self.update_toolbar()
+        self.record_history()
         
     def clearLayout(self):
+        self.record("clear")
         self.errorLabel.setText("")
-        self.triangle = []
+        self.model.clear()
         for action in self.toolBar.actions():
             if type(action.data()) == GeometryType:
                 action.setEnabled(True)
             else:
                 action.setDisabled(True)
         self.toolBar.actions()[3].setDisabled(True)
-        self.graphWidget.removeItem(self.graph_triangle)
-        try:
-            self.graphWidget.removeItem(self.second_triangle)
-        except:
-            pass       
-        for i in range(self.vLayout.count()-1):
-            myWidget = self.vLayout.itemAt(i).widget()
-            myWidget.deleteLater()    
-
-    def remove_parameter(self, e: DockElement):
+        self.graph_triangle = self.release(self.graph_triangle)
+        self.second_triangle = self.release(self.second_triangle)
+        for item in self.state.matches:
+            self.release(item)
+        self.state.matches = []
+        self.record_history()
+
+    def remove_parameter(self, removed: Geometry):
+        self.record("remove", row=self.triangle.index(removed))
         self.errorLabel.setText("")
         # 1 disabilita l'opzione compreso
         # 2 aggiorna la ui di ogni dockelement
-        uids = [geometry.uid for geometry in self.triangle]
-        for geometry in self.triangle:
-            if geometry.uid == e.geometry.uid:
-                self.triangle.remove(geometry)
-        e.setParent(None)
+        self.model.remove(removed)
         if len(self.triangle) == 3:
             angles_count=0
             sides_count=0
-            for i in range(self.vLayout.count()-1):
-                myWidget = self.vLayout.itemAt(i).widget()
-                if myWidget.geometry.type == GeometryType.ANGLE:
+            for geometry in self.triangle:
+                if geometry.type == GeometryType.ANGLE:
                     angles_count += 1
-                elif myWidget.geometry.type == GeometryType.SIDE:
+                elif geometry.type == GeometryType.SIDE:
                     sides_count += 1
             if angles_count == 1:
-                for i in range(self.vLayout.count()-1):
-                    myWidget = self.vLayout.itemAt(i).widget()
-                    if myWidget.geometry.type == GeometryType.ANGLE:
-                        myWidget.geometry.between = True
+                for geometry in self.triangle:
+                    if geometry.type == GeometryType.ANGLE:
+                        geometry.between = True
                     else:
-                        myWidget.geometry.between = False
+                        geometry.between = False
             elif sides_count == 1:
-                for i in range(self.vLayout.count()-1):
-                    myWidget = self.vLayout.itemAt(i).widget()
-                    if myWidget.geometry.type == GeometryType.SIDE:
-                        myWidget.geometry.between = True
+                for geometry in self.triangle:
+                    if geometry.type == GeometryType.SIDE:
+                        geometry.between = True
                     else:
-                        myWidget.geometry.between = False
+                        geometry.between = False
             
         if len(self.triangle) == 5:
-            self.graphWidget.removeItem(self.graph_triangle)
+            self.graph_triangle = self.release(self.graph_triangle)
         if len(self.triangle) == 8:
-            self.graphWidget.removeItem(self.graph_triangle)
-            self.graphWidget.removeItem(self.second_triangle)
+            self.graph_triangle = self.release(self.graph_triangle)
+            self.second_triangle = self.release(self.second_triangle)
             
         if len(self.triangle) == 2:
-            for i in range(self.vLayout.count()-1):
-                myWidget = self.vLayout.itemAt(i).widget()
-                myWidget.geometry.between = False
-        for i in range(self.vLayout.count()-1):
-                myWidget = self.vLayout.itemAt(i).widget()
-                myWidget.setStyleSheet("")
-                myWidget.updateUI()
-        self.update_toolbar()        
+            for geometry in self.triangle:
+                geometry.between = False
+        self.model.clear_highlights()
+        self.update_toolbar()
+        self.record_history()        
      
     def add_or_update_parameter(self, type, name, value, static, *args):
         new_geometry = Geometry(type, name, value)
@@ -802,18 +1605,16 @@ class Window(QMainWindow):
             # check if param already exists
             if self.get_by_name(name)[0] != None:
                 # replace existing param
-                for i in range(self.vLayout.count()-1):
-                    myWidget = self.vLayout.itemAt(i).widget()
-                    if myWidget.geometry.name == name:
-                        if type == GeometryType.ANGLE:
-                            myWidget.valueLabel.setText("{:.1f}°".format(value))
-                            return
-                        myWidget.valueLabel.setText("{:.1f}".format(value))
+                for geometry in self.triangle:
+                    if geometry.name == name:
+                        if geometry.static:
+                            geometry.value = value
+                            self.model.refresh(geometry)
                         return 
                 return
-            self.triangle.append(new_geometry)
+            self.model.append(new_geometry)
         else:
-            self.triangle.append(new_geometry)
+            self.model.append(new_geometry)
             self.update_toolbar()
             # 1 sceglie a quale geometria aggiungere l'opzione compreso (solo se ci sono 3 geometrie)
             # 2 aggiunge il nuovo dockelement al dock
@@ -833,47 +1634,180 @@ class Window(QMainWindow):
                         for y in self.triangle:
                             if y.type == GeometryType.SIDE :
                                 y.between = True
-        # add the dockelement to the dock
-        e = DockElement(new_geometry, static)
+        # evidenzia i parametri della seconda soluzione
         if len(args) > 0:
-           e.setStyleSheet("background-color: lightyellow;")
-        e.button.clicked.connect(partial(self.remove_parameter, e))
-        self.vLayout.insertWidget(self.vLayout.count()-1, e)
-        for i in range(self.vLayout.count()-1):
-            myWidget = self.vLayout.itemAt(i).widget()
-            myWidget.updateUI()
+           self.model.set_highlight(new_geometry, QColor("lightyellow"))
+        self.model.refresh_all()
         
     def on_add_parameter(self, dialog, type):
         name = dialog.comboBox.currentText()
         value = float(dialog.textInput.text())
         
-        self.add_or_update_parameter(type, name, value, False)
+        self.add_parameter(type, name, value)
 
         dialog.close()
 
+    def add_parameter(self, type, name, value):
+        self.record("add", type=type.name, name=name, value=value)
+        self.add_or_update_parameter(type, name, value, False)
+        self.record_history()
+
     def select_parameter(self, type):
-        dialog = AddParameterDialog(type)
-        dialog.buttonBox.accepted.connect(partial(self.on_add_parameter, dialog, type))
+        # i dialoghi vengono creati al primo utilizzo e poi riutilizzati
+        dialog = self.dialogs.get(type)
+        if dialog is None:
+            dialog = AddParameterDialog(type)
+            dialog.buttonBox.accepted.connect(partial(self.on_add_parameter, dialog, type))
+            self.dialogs[type] = dialog
+        dialog.textInput.clear()
         dialog.exec()
     
-    def setupLayout(self):        
+    def select_playback(self):
+        inputs = [geometry for geometry in self.triangle if not geometry.static]
+        if not inputs:
+            self.errorLabel.setText("Nessun parametro da animare")
+            return
+        dialog = self.dialogs.get(PlaybackDialog)
+        if dialog is None:
+            dialog = PlaybackDialog()
+            dialog.buttonBox.accepted.connect(partial(self.on_playback, dialog))
+            self.dialogs[PlaybackDialog] = dialog
+        dialog.comboBox.clear()
+        dialog.comboBox.addItems([geometry.name for geometry in inputs])
+        dialog.startInput.setText(str(inputs[0].value))
+        dialog.endInput.setText(str(inputs[0].value))
+        dialog.exec()
+
+    def on_playback(self, dialog):
+        export = None
+        if dialog.exportCheckbox.isChecked():
+            export = QFileDialog.getExistingDirectory(self, "Cartella dei fotogrammi")
+            if not export:
+                return
+        dialog.close()
+        self.play_parameter(dialog.comboBox.currentText(), float(dialog.startInput.text()), float(dialog.endInput.text()),
+                            dialog.framesInput.value(), dialog.fpsInput.value(), export)
+
+    def play_parameter(self, name, start, end, count, fps=60, export=None):
+        import numpy as np
+        from playback import Playback
+        self.record("play", name=name, start=start, end=end, count=count, fps=fps, export=export)
+        self.createPlot()
+        if self.playback is not None:
+            self.playback.stop()
+        # tutta la sequenza di soluzioni viene calcolata prima di partire
+        known = {geometry.name: geometry.value for geometry in self.triangle if not geometry.static}
+        frames = self.resolver.sweep(known, name, np.linspace(start, end, count))
+        hidden = [item for item in (self.graph_triangle, self.second_triangle) if item is not None and item.isVisible()]
+        for item in hidden:
+            item.hide()
+        # un solo item dal pool, ridisegnato a ogni fotogramma
+        item = self.acquire(0, 0, 1, 0, cos(radians(60)), sin(radians(60)), 60, 60, 60, self.helper.lightblue)
+        self.playback = Playback(self.graphWidget, item, frames, self.state.position, self.helper.lightblue, fps, export)
+        self.playback.finished.connect(partial(self.on_playback_finished, hidden))
+        self.playback.start()
+        return self.playback
+
+    def on_playback_finished(self, hidden, dropped):
+        for item in hidden:
+            if item not in self.pool:
+                item.show()
+        impossible = self.playback.impossible
+        self.release(self.playback.item)
+        self.playback = None
+        if dropped or impossible:
+            self.errorLabel.setText(f"Animazione: {dropped} fotogrammi persi, {impossible} impossibili")
+        else:
+            self.errorLabel.setText("")
+
+    def open_polygon(self, path=None):
+        import polygon
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, "Apri poligono", "", "Vertici (*.txt *.csv)")
+            if not path:
+                return
+        try:
+            points = polygon.load(path)
+        except (ValueError, OSError) as error:
+            self.errorLabel.setText(f"Poligono non valido: {error}")
+            return
+        self.record("polygon", path=path)
+        self.show_polygon(points)
+
+    def show_polygon(self, points):
+        # il poligono viene diviso in triangoli, risolti tutti insieme e disegnati con un solo item
+        import numpy as np
+        import polygon
+        from plot import Polygon
+        self.createPlot()
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if not np.isfinite(points).all():
+            self.errorLabel.setText("Poligono non valido: coordinate non finite")
+            return None
+        triangles = polygon.triangulate(points)
+        if len(triangles) == 0:
+            self.errorLabel.setText("Poligono non valido: servono almeno 3 vertici distinti")
+            return None
+        if self.polygon is not None:
+            self.graphWidget.removeItem(self.polygon)
+        self.polygon = Polygon(points, triangles, self.helper.lightblue)
+        self.polygon.solutions = polygon.solve(self.resolver, points, triangles)
+        self.polygon.picked.connect(self.show_polygon_triangle)
+        self.polygon.setToolTip("Clic su un triangolo per vederne la soluzione")
+        self.graphWidget.addItem(self.polygon)
+        self.graphWidget.autoRange(items=[self.polygon])
+        degenerate = int(np.isnan(self.polygon.solutions).any(axis=1).sum())
+        self.errorLabel.setText(f"{len(triangles)} triangoli, {degenerate} degeneri" if degenerate else "")
+        return self.polygon
+
+    def show_polygon_triangle(self, i):
+        # soluzione del triangolo cliccato, come tooltip dell'item
+        a, b, c, alfa, beta, gamma = self.polygon.solutions[i]
+        if math.isnan(alfa):
+            text = f"Triangolo {i + 1}: degenere"
+        else:
+            text = (f"Triangolo {i + 1}\nLato a: {a:.3g}  Lato b: {b:.3g}  Lato c: {c:.3g}\n"
+                    f"Angolo α: {alfa:.1f}°  Angolo β: {beta:.1f}°  Angolo γ: {gamma:.1f}°")
+        self.polygon.setToolTip(text)
+        QToolTip.showText(QCursor.pos(), text, self.graphWidget)
+        return text
+
+    def setupPlot(self):
+        # pyqtgraph viene importato solo dopo il primo frame
+        if self.graphWidget is not None:
+            return
+        self.createPlot()
+        # triangolo di esempio: solo disegnato, non è una soluzione del triangolo corrente
+        self.graph_triangle = self.acquire(0, 0, 10, 0, 5, sin(radians(60))*10, 60, 60, 60, self.helper.lightblue)
+        self.graph_triangle.setPos(self.state.position)
+
+    def createPlot(self):
+        if self.graphWidget is not None:
+            return
+        import pyqtgraph as pg
         self.graphWidget = pg.PlotWidget()
         self.graphWidget.setAspectLocked(ratio=1)
         self.setCentralWidget(self.graphWidget)
         
-        pen = pg.mkPen(color=(255, 0, 0),width=5)
         self.graphWidget.showGrid(x=True, y=True)
         self.graphWidget.setBackground('w')
-        self.vLayout = QVBoxLayout()
-        self.vLayout.addStretch()
-        self.vWidget = QWidget()
-        self.vWidget.setLayout(self.vLayout)
+        self.plotReady.emit()
+
+    def setupLayout(self):        
+        # segnaposto finché setupPlot non crea il grafico
+        self.graphWidget = None
+        self.setCentralWidget(QWidget())
+        self.parameterDelegate = ParameterDelegate(self)
+        self.parameterDelegate.removeRequested.connect(self.remove_parameter)
+        self.parameterView = ParameterView()
+        self.parameterView.setModel(self.model)
+        self.parameterView.setItemDelegate(self.parameterDelegate)
         self.dockWidget = QDockWidget("Parametri", self)
         self.dockWidget.setAllowedAreas(Qt.LeftDockWidgetArea |
                                        Qt.RightDockWidgetArea)
         self.dockWidget.setMinimumWidth(120)
         self.dockWidget.sizeHint()
-        self.dockWidget.setWidget(self.vWidget)
+        self.dockWidget.setWidget(self.parameterView)
         self.dockWidget.setFeatures(QDockWidget.DockWidgetFloatable | 
                  QDockWidget.DockWidgetMovable)
         self.addDockWidget(Qt.LeftDockWidgetArea, self.dockWidget)
@@ -909,6 +1843,44 @@ class Window(QMainWindow):
         self.addSideShortcut = QShortcut(QKeySequence("Ctrl+L"), self)
         self.addSideShortcut.activated.connect(partial(self.select_parameter, GeometryType.SIDE))
 
+        # workspace
+        self.newTriangleAction = QAction("Nuovo triangolo", self)
+        self.newTriangleAction.triggered.connect(self.new_triangle)
+
+        # sessione
+        self.openSessionAction = QAction("Apri sessione", self)
+        self.openSessionAction.setShortcut(QKeySequence.Open)
+        self.openSessionAction.triggered.connect(lambda: self.open_session())
+        self.saveSessionAction = QAction("Salva sessione", self)
+        self.saveSessionAction.setShortcut(QKeySequence.Save)
+        self.saveSessionAction.triggered.connect(self.save_session)
+
+        # libreria di triangoli risolti
+        self.addToLibraryAction = QAction("Aggiungi alla libreria", self)
+        self.addToLibraryAction.triggered.connect(self.add_to_library)
+        self.findSimilarAction = QAction("Triangoli simili", self)
+        self.findSimilarAction.triggered.connect(self.find_similar)
+        self.scaleAction = QAction("Considera la scala", self)
+        self.scaleAction.setCheckable(True)
+
+        # poligoni
+        self.polygonAction = QAction("Apri poligono", self)
+        self.polygonAction.triggered.connect(lambda: self.open_polygon())
+
+        # animazione di un parametro
+        self.playAction = QAction("Anima parametro", self)
+        self.playAction.triggered.connect(self.select_playback)
+
+        # cronologia
+        self.undoAction = QAction("Annulla", self)
+        self.undoAction.setShortcut(QKeySequence.Undo)
+        self.undoAction.setDisabled(True)
+        self.undoAction.triggered.connect(self.undo)
+        self.redoAction = QAction("Ripeti", self)
+        self.redoAction.setShortcut(QKeySequence.Redo)
+        self.redoAction.setDisabled(True)
+        self.redoAction.triggered.connect(self.redo)
+
     def createToolBar(self):
         # create tool bar
         self.toolBar = QToolBar()
@@ -918,10 +1890,54 @@ class Window(QMainWindow):
         self.errorLabel = QLabel("")
         self.errorLabel.setStyleSheet('color: red')
         self.toolBar.addWidget(self.errorLabel)
+        # tool bar del workspace, separata perché update_toolbar agisce su tutte le azioni della prima
+        self.workspaceBar = QToolBar()
+        self.addToolBar(self.workspaceBar)
+        self.triangleSelector = QComboBox()
+        # con sessioni grandi la combo non deve misurare tutte le voci
+        self.triangleSelector.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.triangleSelector.setMinimumContentsLength(12)
+        self.triangleSelector.setModel(self.workspace)
+        self.triangleSelector.view().setUniformItemSizes(True)
+        self.triangleSelector.currentIndexChanged.connect(self.select_triangle)
+        self.workspaceBar.addAction(self.openSessionAction)
+        self.workspaceBar.addAction(self.saveSessionAction)
+        self.workspaceBar.addWidget(self.triangleSelector)
+        self.workspaceBar.addAction(self.newTriangleAction)
+        self.workspaceBar.addAction(self.undoAction)
+        self.workspaceBar.addAction(self.redoAction)
+        self.workspaceBar.addSeparator()
+        self.workspaceBar.addAction(self.addToLibraryAction)
+        self.workspaceBar.addAction(self.findSimilarAction)
+        self.workspaceBar.addAction(self.scaleAction)
+        self.workspaceBar.addSeparator()
+        self.workspaceBar.addAction(self.playAction)
+        self.workspaceBar.addAction(self.polygonAction)
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", metavar="FILE", help="registra le interazioni per replay.py")
+    parser.add_argument("--session", metavar="FILE", help="sessione da aprire all'avvio")
+    parser.add_argument("--polygon", metavar="FILE", help="poligono da aprire all'avvio, un vertice per riga")
+    parser.add_argument("--library", metavar="FILE", default="libreria.npz", help="libreria di triangoli risolti")
+    parser.add_argument("--startup-report", action="store_true", help="stampa i tempi di avvio ed esce (usato da startup.py)")
+    options, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    import qdarktheme
     qdarktheme.setup_theme(theme="light")
     win = Window()
+    win.library_path = options.library
+    if options.session:
+        win.plotReady.connect(partial(win.open_session, options.session))
+    if options.polygon:
+        win.plotReady.connect(partial(win.open_polygon, options.polygon))
+    if options.record:
+        win.recorder = Recorder(options.record)
+        app.aboutToQuit.connect(win.recorder.close)
+    if options.startup_report:
+        elapsed = lambda: (time.perf_counter() - STARTED)*1000
+        win.firstFrame.connect(lambda: print("first-frame {:.1f}".format(elapsed()), flush=True))
+        win.plotReady.connect(lambda: print("plot-ready {:.1f}".format(elapsed()), flush=True))
+        win.plotReady.connect(app.quit, Qt.QueuedConnection)
     win.show()
     sys.exit(app.exec_())
@@ -0,0 +1,78 @@
+import os
+import time
+from math import sin, cos, radians, isnan
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt, QTimer
+
+class Playback(QtCore.QObject):
+    # riproduce una sequenza di soluzioni [a, b, c, alfa, beta, gamma] già calcolata;
+    # un solo item viene ridisegnato a ogni fotogramma con Triangle.build, invece di un item per fotogramma
+    frameShown = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(int)
+
+    def __init__(self, graphWidget, item, frames, position, color, fps=60, export=None):
+        super().__init__()
+        self.graphWidget = graphWidget
+        self.item = item
+        self.frames = frames
+        self.color = color
+        self.fps = fps
+        self.export = export
+        self.impossible = sum(1 for a, b, c, alfa, beta, gamma in frames if isnan(a) or isnan(alfa))
+        self.item.setPos(position)
+        self.item.hide()
+        self.current = -1
+        self.dropped = 0
+        self.running = False
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def start(self):
+        self.running = True
+        self.started = time.perf_counter()
+        self.show(0)
+        if self.export is not None:
+            # in esportazione ogni fotogramma viene disegnato e salvato, senza saltarne
+            self.timer.start(0)
+        else:
+            self.timer.start(max(1, int(1000/self.fps)))
+
+    def tick(self):
+        if self.export is not None:
+            due = self.current + 1
+        else:
+            # frame pacing: il fotogramma da mostrare dipende dal tempo trascorso, non dal numero di tick
+            due = int((time.perf_counter() - self.started)*self.fps)
+            if due <= self.current:
+                return
+            due = min(due, len(self.frames) - 1)
+            self.dropped += due - self.current - 1
+        if due >= len(self.frames):
+            self.stop()
+            return
+        self.show(due)
+        if due == len(self.frames) - 1:
+            self.stop()
+
+    def show(self, i):
+        self.current = i
+        a, b, c, alfa, beta, gamma = self.frames[i]
+        # triangolo impossibile: resta visibile il fotogramma precedente
+        if not (isnan(a) or isnan(alfa)):
+            self.item.build(0, 0, c, 0, cos(radians(alfa))*b, sin(radians(alfa))*b, alfa, beta, gamma, self.color)
+            self.item.show()
+        if self.export is not None:
+            self.graphWidget.grab().save(os.path.join(self.export, f"frame_{i:05d}.png"))
+        self.frameShown.emit(i)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.timer.stop()
+        self.item.hide()
+        self.finished.emit(self.dropped)
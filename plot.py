@@ -0,0 +1,304 @@
+from PyQt5.QtCore import Qt, QPointF, QRectF, QLineF, pyqtSignal
+from PyQt5.QtGui import QPicture, QPainter, QFont, QPen, QBrush, QPolygonF, QColor, QPainterPath, QTextOption, QFontMetricsF
+from PyQt5.QtWidgets import QGraphicsItem
+import numpy as np
+import pyqtgraph as pg
+
+class Triangle(pg.GraphicsObject):
+    # larghezza minima (in pixel) sotto la quale non si disegnano archi ed etichette
+    LOD_MIN_WIDTH = 40
+    ANGLE_RADIUS = 3
+
+    def __init__(self, *args):
+        super().__init__()
+        # serve per avere exposedRect in paint() e scartare le aree non visibili
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        # picture contiene lati e vertici, detail archi ed etichette
+        self.picture = QPicture()
+        self.detail = QPicture()
+        self.build(*args)
+
+    def build(self, x1, y1, x2, y2, x3, y3, alfa, beta, gamma, color, *args):
+        # ridisegna l'item sul posto: aprire un QPainter su una QPicture ne cancella il contenuto,
+        # così un item già creato può essere riutilizzato per un altro triangolo
+        self.prepareGeometryChange()
+        self.pen = QPen()
+        self.pen.setWidthF(0.1)
+        self.pen.setJoinStyle(Qt.MiterJoin)
+        self.pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        # larghezza dei soli vertici, senza archi ed etichette che hanno dimensione fissa
+        self.width = max(x1, x2, x3) - min(x1, x2, x3)
+        if len(args) > 0:
+            QPainter(self.detail).end()
+            self.painter = QPainter(self.picture)
+            self.triangle = QPolygonF([QPointF(x1, y1,),QPointF(x2, y2,), QPointF(x3, y3,) ])
+            self.brush = QBrush(color)
+            self.painter.setPen(self.pen)
+            self.painter.setBrush(self.brush)
+            self.painter.drawPolygon(self.triangle, Qt.WindingFill)
+            self.painter.end()
+            self.bounds = self.pad(self.triangle.boundingRect(), self.pen.widthF()/2)
+        else:
+            self.bounds = QRectF()
+            self.painter = QPainter(self.detail)
+            self.painter.scale(1,-1)
+
+            # draw angles        
+            self.drawAngle(0,0, self.ANGLE_RADIUS, 0, alfa, QColor(0,100,0,100))
+            self.drawAngle(x2, y2, self.ANGLE_RADIUS, 180, -beta, QColor(0,0,255,100))
+            new_gamma = gamma
+            #if gamma > 90:
+            #    new_gamma = 90 + gamma
+            self.drawAngle(x3, y3, self.ANGLE_RADIUS, -beta, -new_gamma, QColor(255,0,0,100))
+
+            
+            #self.drawText(x2, y2-1.5, "β")
+            #self.drawText(x3, y3+0.75, "γ")
+            
+            self.painter.setPen(Qt.black)
+            self.painter.setFont(QFont('Arial', 1))
+            self.fontMetrics = QFontMetricsF(self.painter.font(), self.detail)
+            
+            # draw text
+            self.drawText(x1, y1-1.5, "α")
+            self.drawText(x2, y2-1.5, "β")
+            self.drawText(x3, y3+0.75, "γ")
+
+            
+            ax = x3+(x2-x3)/2
+            ay = abs((y2-y3)/2)
+            self.drawText(ax+1, ay+1, "a")
+
+            bx = (x3-x1)/2
+            by = abs((y3-y1)/2)
+            self.drawText(bx-1, by+1, "b")
+        
+            cx = x2/2
+            cy = -1.5
+            self.drawText(cx-1, cy, "c")
+            self.painter.end()
+            
+            # setup paint options
+            self.painter = QPainter(self.picture)
+            self.brush = QBrush(color)
+            self.painter.setRenderHint(QPainter.Antialiasing)
+            self.painter.setBrush(self.brush)
+
+            # draw lines
+            # lato a
+            self.pen.setColor(Qt.red)
+            self.painter.setPen(self.pen)
+            self.painter.drawLine(QLineF(x1, y1, x2, y2))
+            # lato c
+            self.pen.setColor(Qt.darkGreen)
+            self.painter.setPen(self.pen)
+            self.painter.drawLine(QLineF(x2, y2, x3, y3))
+            # lato b
+            self.pen.setColor(Qt.blue)
+            self.painter.setPen(self.pen)
+            self.painter.drawLine(QLineF(x1, y1, x3, y3))
+            
+            # draw points
+            self.dotpen = QPen(Qt.black, 0.2 , Qt.DashDotLine, Qt.RoundCap, Qt.RoundJoin)
+            # punto A
+            self.dotpen.setColor(Qt.darkGreen)
+            self.painter.setPen(self.dotpen)         
+            self.painter.drawPoint(QPointF(x1, y1))
+            # punto B
+            self.dotpen.setColor(Qt.blue)
+            self.painter.setPen(self.dotpen)         
+            self.painter.drawPoint(QPointF(x2, y2))
+            # punto C
+            self.dotpen.setColor(Qt.red)
+            self.painter.setPen(self.dotpen)         
+            self.painter.drawPoint(QPointF(x3, y3))
+
+            self.painter.end()
+            vertices = QPolygonF([QPointF(x1, y1), QPointF(x2, y2), QPointF(x3, y3)])
+            self.bounds = self.bounds.united(self.pad(vertices.boundingRect(), self.dotpen.widthF()/2))
+        self.painter = None
+        self.update()
+
+    def pad(self, rect, margin):
+        return rect.adjusted(-margin, -margin, margin, margin)
+
+    def flip(self, rect):
+        # da coordinate capovolte (scale(1,-1)) a coordinate dell'item
+        return QRectF(rect.x(), -rect.bottom(), rect.width(), rect.height())
+
+    def drawAngle(self, x, y, radius, startAngle, angle, color):
+        myBrush = QBrush()
+        myBrush.setColor(color)
+        myBrush.setStyle(Qt.SolidPattern)
+        myPen = QPen()
+        myPen.setColor(QColor(255,255,255,255))
+        startPoint = QPointF()
+        center = QPointF(0, 0)
+        myPath = QPainterPath()
+        myPath.moveTo(center)
+        myPath.arcTo(QRectF(-radius,-radius,radius*2, radius*2), startAngle,
+                    angle)
+        myPath.translate(x,-y)
+        myPen.setWidthF(0.01)
+        self.painter.setBrush(myBrush)
+        self.painter.setPen(myPen)
+        self.painter.drawPath(myPath)
+        self.bounds = self.bounds.united(self.flip(self.pad(myPath.boundingRect(), myPen.widthF()/2)))
+
+    def drawText(self, x, y, text):
+        rect = QRectF(x-25, -y-25, 50, 50)
+        self.painter.drawText(rect, text, QTextOption(Qt.AlignCenter))
+        self.bounds = self.bounds.united(self.flip(self.fontMetrics.boundingRect(rect, Qt.AlignCenter, text)))
+         
+    def paint(self, painter, option, widget=None):
+        # culling: niente da fare se l'area esposta non tocca il triangolo
+        if not option.exposedRect.intersects(self.bounds):
+            return
+        # level of detail: archi ed etichette solo se il triangolo è abbastanza grande
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        if lod*self.width >= self.LOD_MIN_WIDTH:
+            painter.drawPicture(0, 0, self.detail)
+        painter.drawPicture(0, 0, self.picture)
+
+    def boundingRect(self):
+        return QRectF(self.bounds)
+
+class Polygon(pg.GraphicsObject):
+    # tutti i triangoli di un poligono in un solo item, divisi in riquadri con la propria QPicture
+    # così paint() disegna solo i riquadri che toccano l'area esposta
+    TILES = 16
+    # oltre questo numero di triangoli abbastanza grandi da mostrare i dettagli si disegnano solo i lati
+    DETAIL_LIMIT = 500
+    # colori di lati e archi come in Triangle: lato AB rosso, BC verde, AC blu
+    SIDE_COLORS = (Qt.red, Qt.darkGreen, Qt.blue)
+    ANGLE_COLORS = (QColor(0,100,0,100), QColor(0,0,255,100), QColor(255,0,0,100))
+    ANGLE_NAMES = ("α", "β", "γ")
+    picked = pyqtSignal(int)
+
+    def __init__(self, points, triangles, color):
+        super().__init__()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        # penne cosmetiche: con migliaia di triangoli piccoli uno spessore in coordinate coprirebbe il riempimento
+        self.pens = []
+        for side_color in self.SIDE_COLORS:
+            pen = QPen(side_color)
+            pen.setWidthF(0)
+            pen.setCosmetic(True)
+            pen.setJoinStyle(Qt.MiterJoin)
+            self.pens.append(pen)
+        self.brush = QBrush(color)
+        self.selected = None
+        self.tiles = []
+        self.bounds = QRectF()
+        self.vertices = points[triangles]
+        if len(triangles) == 0:
+            return
+        vertices = self.vertices
+        low, high = vertices.min(axis=1), vertices.max(axis=1)
+        # larghezza di ogni triangolo per il level of detail, come in Triangle
+        self.widths = high[:, 0] - low[:, 0]
+        self.low, self.high = low, high
+        centers = vertices.mean(axis=1)
+        first, last = centers.min(axis=0), centers.max(axis=0)
+        cells = ((centers - first)/((last - first)/self.TILES + 1e-300)).astype(int).clip(0, self.TILES - 1)
+        keys = cells[:, 0]*self.TILES + cells[:, 1]
+        order = keys.argsort(kind="stable")
+        for chunk in np.split(order, np.flatnonzero(np.diff(keys[order])) + 1):
+            if len(chunk) == 0:
+                continue
+            picture = QPicture()
+            painter = QPainter(picture)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.brush)
+            triangles = vertices[chunk].tolist()
+            for triangle in triangles:
+                painter.drawPolygon(QPolygonF([QPointF(x, y) for x, y in triangle]))
+            for pen, (i, j) in zip(self.pens, ((0, 1), (1, 2), (0, 2))):
+                painter.setPen(pen)
+                painter.drawLines([QLineF(t[i][0], t[i][1], t[j][0], t[j][1]) for t in triangles])
+            painter.end()
+            (left, bottom), (right, top) = low[chunk].min(axis=0), high[chunk].max(axis=0)
+            rect = QRectF(left, bottom, right - left, top - bottom)
+            self.tiles.append((rect, picture, chunk, self.widths[chunk].max()))
+            self.bounds = self.bounds.united(rect)
+
+    def paint(self, painter, option, widget=None):
+        exposed = option.exposedRect
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        detailed = []
+        for rect, picture, chunk, widest in self.tiles:
+            if exposed.intersects(rect):
+                painter.drawPicture(0, 0, picture)
+                # level of detail: archi ed etichette solo per i triangoli larghi almeno LOD_MIN_WIDTH pixel
+                if lod*widest >= Triangle.LOD_MIN_WIDTH:
+                    detailed.append(chunk[(lod*self.widths[chunk] >= Triangle.LOD_MIN_WIDTH) &
+                                          (self.high[chunk, 0] >= exposed.left()) & (self.low[chunk, 0] <= exposed.right()) &
+                                          (self.high[chunk, 1] >= exposed.top()) & (self.low[chunk, 1] <= exposed.bottom())])
+        detailed = np.concatenate(detailed) if detailed else []
+        if 0 < len(detailed) <= self.DETAIL_LIMIT:
+            self.drawDetail(painter, detailed)
+        if self.selected is not None:
+            pen = QPen(Qt.black)
+            pen.setWidthF(3)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPolygon(QPolygonF([QPointF(x, y) for x, y in self.vertices[self.selected].tolist()]))
+
+    def drawDetail(self, painter, triangles):
+        # archi ed etichette in pixel, così hanno la stessa dimensione a ogni zoom
+        transform = painter.worldTransform()
+        painter.save()
+        painter.resetTransform()
+        painter.setRenderHint(QPainter.Antialiasing)
+        font = QFont('Arial')
+        font.setPixelSize(12)
+        painter.setFont(font)
+        for triangle in self.vertices[triangles].tolist():
+            corners = [transform.map(QPointF(x, y)) for x, y in triangle]
+            center = (corners[0] + corners[1] + corners[2])/3
+            for i, corner in enumerate(corners):
+                first, second = corners[(i + 1) % 3] - corner, corners[(i + 2) % 3] - corner
+                radius = min(30.0, 0.3*min(np.hypot(first.x(), first.y()), np.hypot(second.x(), second.y())))
+                # angoli di Qt in senso antiorario sullo schermo, con y verso il basso
+                start = np.degrees(np.arctan2(-first.y(), first.x()))
+                span = (np.degrees(np.arctan2(-second.y(), second.x())) - start + 180) % 360 - 180
+                path = QPainterPath()
+                path.moveTo(corner)
+                path.arcTo(QRectF(corner.x() - radius, corner.y() - radius, 2*radius, 2*radius), start, span)
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(self.ANGLE_COLORS[i])
+                painter.drawPath(path)
+                inward = center - corner
+                distance = np.hypot(inward.x(), inward.y())
+                if distance > 0:
+                    label = corner + inward*(min(radius + 8, distance/2)/distance)
+                    painter.setPen(Qt.black)
+                    painter.drawText(QRectF(label.x() - 10, label.y() - 10, 20, 20), Qt.AlignCenter, self.ANGLE_NAMES[i])
+        painter.restore()
+
+    def triangle_at(self, point):
+        # indice del triangolo che contiene point, None se fuori dal poligono
+        if len(self.vertices) == 0:
+            return None
+        x, y = point.x(), point.y()
+        A, B, C = self.vertices[:, 0], self.vertices[:, 1], self.vertices[:, 2]
+        inside = np.ones(len(self.vertices), dtype=bool)
+        for P, Q in ((A, B), (B, C), (C, A)):
+            inside &= (Q[:, 0] - P[:, 0])*(y - P[:, 1]) - (Q[:, 1] - P[:, 1])*(x - P[:, 0]) >= 0
+        found = np.flatnonzero(inside)
+        return int(found[0]) if len(found) else None
+
+    def mouseClickEvent(self, ev):
+        if ev.button() != Qt.LeftButton:
+            return
+        i = self.triangle_at(ev.pos())
+        if i is None:
+            return
+        ev.accept()
+        self.selected = i
+        self.update()
+        self.picked.emit(i)
+
+    def boundingRect(self):
+        return QRectF(self.bounds)
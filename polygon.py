@@ -0,0 +1,215 @@
+import heapq
+import numpy as np
+
+# ear clipping con lista concatenata di vertici e griglia uniforme dei vertici concavi:
+# solo un vertice concavo può cadere dentro un'orecchia, quindi il test guarda soltanto
+# le celle coperte dal triangolo candidato invece di tutto il poligono
+
+def load(path):
+    # un vertice per riga, "x y" oppure "x,y"
+    with open(path) as f:
+        text = f.read().replace(",", " ")
+    values = np.array(text.split(), dtype=float)
+    if len(values) % 2:
+        raise ValueError("numero dispari di coordinate")
+    return values.reshape(-1, 2)
+
+def clean(points):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    # niente vertici ripetuti consecutivi né chiusura esplicita
+    keep = np.any(points != np.roll(points, 1, axis=0), axis=1)
+    if len(points) > 0 and not keep.any():
+        keep[0] = True
+    return np.flatnonzero(keep)
+
+def area(points):
+    x, y = points[:, 0], points[:, 1]
+    return (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))/2
+
+def triangulate(points):
+    # restituisce un array (n, 3) di indici in points, triangoli in senso antiorario
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    order = clean(points)
+    if len(order) < 3:
+        return np.empty((0, 3), dtype=int)
+    if area(points[order]) < 0:
+        order = order[::-1]
+    xs = points[order, 0].tolist()
+    ys = points[order, 1].tolist()
+    n = len(order)
+    prev = [i - 1 for i in range(n)]
+    prev[0] = n - 1
+    nxt = [i + 1 for i in range(n)]
+    nxt[-1] = 0
+    removed = [False]*n
+
+    def cross(p, c, q):
+        return (xs[c] - xs[p])*(ys[q] - ys[c]) - (ys[c] - ys[p])*(xs[q] - xs[c])
+
+    reflex = [cross(prev[i], i, nxt[i]) <= 0 for i in range(n)]
+
+    # griglia di celle quadrate, circa due vertici concavi per cella anche per poligoni molto allungati
+    left, right, bottom, top = min(xs), max(xs), min(ys), max(ys)
+    candidates = [i for i in range(n) if reflex[i]]
+    cells = max(1, len(candidates)/2)
+    size = np.sqrt((right - left)*(top - bottom)/cells) or max(right - left, top - bottom)/cells or 1.0
+    concave = [len(candidates)]
+    waiting = {}
+    grid = {}
+    for i in candidates:
+        grid.setdefault((int((xs[i] - left)/size), int((ys[i] - bottom)/size)), []).append(i)
+
+    def convex(v):
+        # il vertice non può più bloccare orecchie: esce dalla griglia e i candidati che bloccava tornano in coda
+        concave[0] -= 1
+        grid[int((xs[v] - left)/size), int((ys[v] - bottom)/size)].remove(v)
+        for c in waiting.pop(v, ()):
+            if not removed[c]:
+                push(c)
+
+    def blocker(c):
+        # None se c è un'orecchia, altrimenti il vertice concavo che lo impedisce (c stesso se non è convesso)
+        p, q = prev[c], nxt[c]
+        px, py, cx, cy, qx, qy = xs[p], ys[p], xs[c], ys[c], xs[q], ys[q]
+        if (cx - px)*(qy - cy) - (cy - py)*(qx - cx) <= 0:
+            return c
+        left_, right_ = min(px, cx, qx), max(px, cx, qx)
+        bottom_, top_ = min(py, cy, qy), max(py, cy, qy)
+        x0, x1 = int((left_ - left)/size), int((right_ - left)/size)
+        y0, y1 = int((bottom_ - bottom)/size), int((top_ - bottom)/size)
+        if (x1 - x0 + 1)*(y1 - y0 + 1) > concave[0]:
+            # triangolo grande rispetto ai vertici concavi rimasti: si scorrono quelli invece delle celle
+            if len(candidates) > 2*concave[0]:
+                candidates[:] = [v for v in candidates if reflex[v] and not removed[v]]
+            cells = [candidates]
+        elif x1 - x0 < 2 or y1 - y0 < 2:
+            cells = [grid.get((gx, gy)) for gx in range(x0, x1 + 1) for gy in range(y0, y1 + 1)]
+        else:
+            # riga per riga solo le celle attraversate dal triangolo, non tutto il suo rettangolo:
+            # per i triangoli lunghi e obliqui la differenza è grande
+            cells = []
+            edges = []
+            for ax, ay, bx, by in ((px, py, cx, cy), (cx, cy, qx, qy), (qx, qy, px, py)):
+                if ay > by:
+                    ax, ay, bx, by = bx, by, ax, ay
+                edges.append((ax, ay, by, (bx - ax)/(by - ay) if by > ay else 0.0))
+            for gy in range(y0, y1 + 1):
+                low = bottom + gy*size
+                high = low + size
+                low = low if low > bottom_ else bottom_
+                high = high if high < top_ else top_
+                first, last = right_, left_
+                for ax, ay, by, slope in edges:
+                    if by < low or ay > high:
+                        continue
+                    start = ax + ((low if low > ay else ay) - ay)*slope
+                    end = ax + ((high if high < by else by) - ay)*slope
+                    if start > end:
+                        start, end = end, start
+                    first = start if start < first else first
+                    last = end if end > last else last
+                if first <= last:
+                    cells += [grid.get((gx, gy)) for gx in range(int((first - left)/size), int((last - left)/size) + 1)]
+        for cell in cells:
+            if not cell:
+                continue
+            for v in cell:
+                vx, vy = xs[v], ys[v]
+                if vx < left_ or vx > right_ or vy < bottom_ or vy > top_ or v == p or v == q:
+                    continue
+                if removed[v] or not reflex[v] or (vx == px and vy == py) or (vx == qx and vy == qy):
+                    continue
+                # test inclusivo: un vertice sul bordo della diagonale la rende non valida
+                if ((cx - px)*(vy - py) - (cy - py)*(vx - px) >= 0 and
+                        (qx - cx)*(vy - cy) - (qy - cy)*(vx - cx) >= 0 and
+                        (px - qx)*(vy - qy) - (py - qy)*(vx - qx) >= 0):
+                    return v
+        return None
+
+    triangles = []
+
+    def clip(c, triangle=True):
+        p, q = prev[c], nxt[c]
+        if triangle:
+            triangles.append((p, c, q))
+        nxt[p] = q
+        prev[q] = p
+        removed[c] = True
+        if reflex[c]:
+            convex(c)
+        # tagliando un'orecchia gli angoli dei vicini possono solo diminuire: da concavi a convessi, mai il contrario
+        for v in (p, q):
+            if reflex[v] and cross(prev[v], v, nxt[v]) > 0:
+                reflex[v] = False
+                convex(v)
+            elif not triangle and not reflex[v] and cross(prev[v], v, nxt[v]) <= 0:
+                # togliere un vertice allineato può rendere di nuovo concavo un vicino
+                reflex[v] = True
+                concave[0] += 1
+                candidates.append(v)
+                grid.setdefault((int((xs[v] - left)/size), int((ys[v] - bottom)/size)), []).append(v)
+
+    def push(v):
+        # le orecchie piccole vengono tagliate per prime: i triangoli grandi, costosi da verificare,
+        # restano alla fine quando quasi tutti i vertici concavi sono spariti
+        p, q = prev[v], nxt[v]
+        stamp[v] += 1
+        heapq.heappush(queue, (max((xs[p] - xs[q])**2 + (ys[p] - ys[q])**2,
+                                   (xs[p] - xs[v])**2 + (ys[p] - ys[v])**2,
+                                   (xs[q] - xs[v])**2 + (ys[q] - ys[v])**2), v, stamp[v]))
+
+    # coda di priorità dei candidati: all'inizio tutti i vertici, poi solo i vicini delle orecchie tagliate,
+    # gli unici il cui triangolo è cambiato; un vertice scartato non viene riprovato finché non cambia
+    queue = []
+    stamp = [0]*n
+    for v in range(n):
+        push(v)
+    remaining = n
+    progress = False
+    ear = 0
+    while remaining > 3:
+        if not queue:
+            if not progress:
+                # nessuna orecchia tra tutti i vertici: poligono degenere (autointersezioni, tratti sovrapposti);
+                # si taglia comunque il primo vertice convesso per terminare
+                for _ in range(remaining):
+                    if cross(prev[ear], ear, nxt[ear]) > 0:
+                        break
+                    ear = nxt[ear]
+                following = nxt[ear]
+                clip(ear)
+                remaining -= 1
+                ear = following
+            # caso raro: si ricontrolla tutto il poligono
+            progress = False
+            v = ear
+            for _ in range(remaining):
+                push(v)
+                v = nxt[v]
+            continue
+        _, c, version = heapq.heappop(queue)
+        if removed[c] or version != stamp[c]:
+            continue
+        p, q = prev[c], nxt[c]
+        if cross(p, c, q) == 0:
+            # vertice allineato con i vicini (o punta di spessore nullo): si toglie senza triangolo
+            clip(c, False)
+        else:
+            v = blocker(c)
+            if v is not None:
+                if v != c:
+                    waiting.setdefault(v, []).append(c)
+                continue
+            clip(c)
+        remaining -= 1
+        progress = True
+        ear = q
+        push(p)
+        push(q)
+    triangles.append((prev[ear], ear, nxt[ear]))
+    return order[np.array(triangles, dtype=int)]
+
+def solve(resolver, points, triangles):
+    # soluzioni [a, b, c, alfa, beta, gamma] di tutti i triangoli con il percorso vettoriale del Resolver
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    return resolver.vertices_batch(*(points[triangles[:, i]] for i in range(3)))
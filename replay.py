@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import time
+import argparse
+# senza display: la finestra viene disegnata in memoria
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication
+import app
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[round(p/100*(len(ordered)-1))]
+
+def editor(win, row):
+    index = win.model.index(row)
+    win.parameterView.open_editor(index)
+    return win.parameterView.indexWidget(index)
+
+def apply(win, event):
+    kind = event["event"]
+    if kind == "add":
+        win.add_parameter(app.GeometryType[event["type"]], event["name"], event["value"])
+    elif kind == "remove":
+        win.remove_parameter(win.triangle[event["row"]])
+    elif kind == "slider":
+        editor(win, event["row"]).slider.setValue(event["value"])
+    elif kind == "between":
+        editor(win, event["row"]).checkbox.setCheckState(event["state"])
+    elif kind == "resolve":
+        win.resolve_triangle()
+    elif kind == "clear":
+        win.clearLayout()
+    elif kind == "new":
+        win.new_triangle()
+    elif kind == "select":
+        win.triangleSelector.setCurrentIndex(event["index"])
+    elif kind == "undo":
+        win.undo()
+    elif kind == "redo":
+        win.redo()
+    elif kind == "open":
+        win.open_session(event["path"])
+    elif kind == "polygon":
+        win.open_polygon(event["path"])
+    elif kind == "play":
+        win.play_parameter(event["name"], event["start"], event["end"], event["count"], event["fps"], event["export"])
+    elif kind == "library":
+        win.add_to_library()
+    elif kind == "similar":
+        win.scaleAction.setChecked(event["scale"])
+        win.find_similar()
+
+def report(name, samples):
+    ms = [sample*1000 for sample in samples]
+    print("{:<10} {:>7} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f}".format(
+        name, len(ms), percentile(ms, 50), percentile(ms, 90), percentile(ms, 99), max(ms)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Riproduce una sessione registrata con app.py --record")
+    parser.add_argument("file")
+    parser.add_argument("--realtime", action="store_true", help="rispetta i tempi registrati")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--library", metavar="FILE", default="libreria.npz", help="libreria usata dagli eventi library e similar")
+    options = parser.parse_args()
+    with open(options.file) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+
+    qapp = QApplication(sys.argv[:1])
+    latencies = {}
+    frames = []
+    for _ in range(options.repeat):
+        win = app.Window()
+        win.library_path = options.library
+        app.win = win
+        win.show()
+        win.setupPlot()
+        qapp.processEvents()
+        start = time.perf_counter()
+        for event in events:
+            if options.realtime:
+                delay = event["t"] - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            begin = time.perf_counter()
+            apply(win, event)
+            qapp.processEvents()
+            painted = time.perf_counter()
+            # ridisegno sincrono di tutta la finestra: è il tempo del frame
+            win.repaint()
+            end = time.perf_counter()
+            latencies.setdefault(event["event"], []).append(end - begin)
+            frames.append(end - painted)
+        win.close()
+        win.deleteLater()
+        qapp.processEvents()
+
+    print("{:<10} {:>7} {:>9} {:>9} {:>9} {:>9}".format("evento", "n", "p50 ms", "p90 ms", "p99 ms", "max ms"))
+    for name, samples in sorted(latencies.items()):
+        report(name, samples)
+    report("totale", [sample for samples in latencies.values() for sample in samples])
+    report("frame", frames)
+
+if __name__ == "__main__":
+    main()
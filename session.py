@@ -0,0 +1,169 @@
+import os
+import mmap
+import struct
+from array import array
+from itertools import accumulate
+
+# formato del file:
+#   intestazione  MAGIC + versione
+#   record        un triangolo ciascuno, aggiunti in coda a ogni salvataggio
+#   indice        offset (u64) e lunghezza (u32) dell'ultimo record di ogni triangolo
+#   coda          posizione dell'indice, numero di triangoli, INDEX_MAGIC
+# un salvataggio aggiunge record, indice e coda dopo la coda precedente, senza sovrascrivere nulla:
+# se si interrompe, all'apertura si torna all'ultima coda completa
+MAGIC = b"TRIS"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+TRAILER = struct.Struct("<QI4s")
+INDEX_MAGIC = b"TIDX"
+
+NAME = struct.Struct("<H")
+POSITION = struct.Struct("<dd")
+COUNT = struct.Struct("<B")
+GEOMETRY = struct.Struct("<BBBd")
+SOLUTION = struct.Struct("<6d")
+
+STATIC = 1
+BETWEEN = 2
+
+def encode(entry):
+    # entry: (nome, (x, y), [(tipo, nome, valore, static, between)], soluzione o None)
+    name, position, geometries, solution = entry
+    name = name.encode()
+    parts = [NAME.pack(len(name)), name, POSITION.pack(*position), COUNT.pack(len(geometries))]
+    for type, geometry_name, value, static, between in geometries:
+        geometry_name = geometry_name.encode()
+        flags = (STATIC if static else 0) | (BETWEEN if between else 0)
+        parts.append(GEOMETRY.pack(type, flags, len(geometry_name), value))
+        parts.append(geometry_name)
+    if solution is None:
+        parts.append(COUNT.pack(0))
+    else:
+        parts.append(COUNT.pack(1))
+        parts.append(SOLUTION.pack(*solution))
+    return b"".join(parts)
+
+def decode(data, offset=0):
+    (length,) = NAME.unpack_from(data, offset)
+    offset += NAME.size
+    name = bytes(data[offset:offset+length]).decode()
+    offset += length
+    position = POSITION.unpack_from(data, offset)
+    offset += POSITION.size
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    geometries = []
+    for _ in range(count):
+        type, flags, length, value = GEOMETRY.unpack_from(data, offset)
+        offset += GEOMETRY.size
+        geometry_name = bytes(data[offset:offset+length]).decode()
+        offset += length
+        geometries.append((type, geometry_name, value, bool(flags & STATIC), bool(flags & BETWEEN)))
+    (solved,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    solution = list(SOLUTION.unpack_from(data, offset)) if solved else None
+    return name, position, geometries, solution
+
+class SessionFile():
+    def __init__(self, path):
+        self.path = path
+        self.offsets = array("Q")
+        self.lengths = array("I")
+        self.map = None
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION))
+                self.end = f.tell()
+                self.write_index(f)
+        self.open()
+
+    def open(self):
+        # all'apertura si legge solo l'indice, i record restano nel file mappato
+        with open(self.path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("file di sessione non valido")
+            self.size = self.trailer(len(self.map))
+            if self.size is None:
+                raise ValueError("indice della sessione danneggiato")
+            self.end, count, _ = TRAILER.unpack_from(self.map, self.size - TRAILER.size)
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self.offsets = array("Q")
+        self.offsets.frombytes(self.map[self.end:self.end + 8*count])
+        self.lengths = array("I")
+        self.lengths.frombytes(self.map[self.end + 8*count:self.end + 12*count])
+
+    def trailer(self, size):
+        # fine dell'ultima coda valida: di solito è la fine del file, dopo un salvataggio interrotto
+        # si cerca all'indietro la coda precedente, che punta a un indice ancora intatto
+        while size >= HEADER.size + TRAILER.size:
+            end, count, index_magic = TRAILER.unpack_from(self.map, size - TRAILER.size)
+            if index_magic == INDEX_MAGIC and end >= HEADER.size and end + 12*count == size - TRAILER.size:
+                return size
+            size = self.map.rfind(INDEX_MAGIC, HEADER.size, size - 1) + len(INDEX_MAGIC)
+        return None
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def read(self, i):
+        return decode(self.map, self.offsets[i])
+
+    def name(self, i):
+        offset = self.offsets[i]
+        (length,) = NAME.unpack_from(self.map, offset)
+        return bytes(self.map[offset + NAME.size:offset + NAME.size + length]).decode()
+
+    def write_index(self, f):
+        f.write(self.offsets.tobytes())
+        f.write(self.lengths.tobytes())
+        # record e indice arrivano su disco prima della coda che li rende validi
+        f.flush()
+        os.fsync(f.fileno())
+        f.write(TRAILER.pack(self.end, len(self.offsets), INDEX_MAGIC))
+        f.truncate()
+
+    def write(self, entries):
+        # salvataggio incrementale: entries è {posizione: entry} con i soli triangoli modificati o nuovi;
+        # i nuovi record sostituiscono il vecchio indice in coda al file
+        self.close()
+        with open(self.path, "r+b") as f:
+            f.seek(self.size)
+            for i in sorted(entries):
+                data = encode(entries[i])
+                if i >= len(self.offsets):
+                    self.offsets.extend([0]*(i + 1 - len(self.offsets)))
+                    self.lengths.extend([0]*(i + 1 - len(self.lengths)))
+                self.offsets[i] = f.tell()
+                self.lengths[i] = len(data)
+                f.write(data)
+            self.end = f.tell()
+            self.write_index(f)
+        self.open()
+        # se i record sostituiti e gli indici vecchi occupano più di quelli validi si riscrive il file compatto
+        if self.size - HEADER.size > 2*(sum(self.lengths) + 12*len(self.lengths) + TRAILER.size) + 4096:
+            self.compact()
+
+    def compact(self):
+        # i record validi vengono copiati di seguito in un'unica scrittura, i nuovi offset sono le somme delle lunghezze
+        records = b"".join([self.map[offset:offset+length] for offset, length in zip(self.offsets, self.lengths)])
+        self.close()
+        self.offsets = array("Q", accumulate(self.lengths, initial=HEADER.size))
+        self.offsets.pop()
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION))
+            f.write(records)
+            self.end = f.tell()
+            self.write_index(f)
+        os.replace(temporary, self.path)
+        self.open()
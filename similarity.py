@@ -0,0 +1,185 @@
+import os
+import heapq
+import numpy as np
+
+# colonne di una riga della libreria
+SIDES = slice(0, 3)
+ANGLES = slice(3, 6)
+
+def shape(triangles):
+    # coordinate di forma: i due angoli minori normalizzati e il logaritmo del perimetro
+    triangles = np.asarray(triangles, dtype=float).reshape(-1, 6)
+    angles = np.sort(triangles[:, ANGLES], axis=1) / 180
+    scale = np.log(triangles[:, SIDES].sum(axis=1))
+    return np.column_stack([angles[:, 0], angles[:, 1], scale])
+
+class ShapeIndex():
+    # kd-tree implicito: in ogni intervallo [lo, hi) il punto mid è il pivot sull'asse depth % 3,
+    # a sinistra [lo, mid) i minori e a destra [mid+1, hi) i maggiori; basta salvare le righe in quest'ordine
+    LEAF = 32
+    # righe aggiunte dopo l'ultima costruzione dell'albero, in coda e cercate una per una:
+    # oltre questo numero l'albero viene ricostruito
+    TAIL_LIMIT = 4096
+
+    def __init__(self, triangles, points=None, ordered=False, indexed=None):
+        self.triangles = np.asarray(triangles, dtype=float).reshape(-1, 6)
+        self.points = shape(self.triangles) if points is None else points
+        if not ordered:
+            order = self.build(self.points)
+            self.triangles = self.triangles[order]
+            self.points = self.points[order]
+        # le righe [0, indexed) sono nell'albero, le altre nella coda
+        self.indexed = len(self.triangles) if indexed is None else indexed
+
+    def __len__(self):
+        return len(self.triangles)
+
+    def tail(self):
+        return len(self) - self.indexed
+
+    def build(self, points):
+        order = np.arange(len(points))
+        stack = [(0, len(points), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= self.LEAF:
+                continue
+            mid = (lo + hi) // 2
+            part = np.argpartition(points[order[lo:hi], depth % 3], mid - lo)
+            order[lo:hi] = order[lo:hi][part]
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+        return order
+
+    def weights(self, scale):
+        # con scale=0 la dimensione del triangolo non conta
+        return np.array([1.0, 1.0, scale * scale])
+
+    def nearest(self, triangle, k=5, scale=0.0):
+        # restituisce [(distanza, riga)] dei k triangoli più simili
+        point = shape(triangle)[0]
+        weights = self.weights(scale)
+        heap = []
+
+        def push(d2, row):
+            if len(heap) < k:
+                heapq.heappush(heap, (-d2, row))
+            elif d2 < -heap[0][0]:
+                heapq.heapreplace(heap, (-d2, row))
+            else:
+                return False
+            return True
+
+        def visit(lo, hi, depth):
+            if hi - lo <= self.LEAF:
+                d2 = (((self.points[lo:hi] - point) ** 2) * weights).sum(axis=1)
+                for i in np.argsort(d2)[:k]:
+                    if not push(d2[i], lo + i):
+                        break
+                return
+            mid = (lo + hi) // 2
+            axis = depth % 3
+            pivot = self.points[mid]
+            push((((pivot - point) ** 2) * weights).sum(), mid)
+            diff = point[axis] - pivot[axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            visit(*near, depth + 1)
+            if len(heap) < k or diff * diff * weights[axis] < -heap[0][0]:
+                visit(*far, depth + 1)
+
+        if self.indexed > 0:
+            visit(0, self.indexed, 0)
+        if self.tail() > 0:
+            # la coda non è ordinata: si scorre tutta
+            d2 = (((self.points[self.indexed:] - point) ** 2) * weights).sum(axis=1)
+            for i in np.argsort(d2)[:k]:
+                if not push(d2[i], self.indexed + i):
+                    break
+        return sorted((float(np.sqrt(-d2)), int(row)) for d2, row in heap)
+
+    def within(self, triangle, radius, scale=0.0):
+        # restituisce [(distanza, riga)] dei triangoli entro radius, dal più simile
+        point = shape(triangle)[0]
+        weights = self.weights(scale)
+        r2 = radius * radius
+        found = []
+        stack = [(0, self.indexed, 0)] if self.indexed > 0 else []
+        if self.tail() > 0:
+            # profondità None: la coda, controllata riga per riga
+            stack.append((self.indexed, len(self), None))
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= self.LEAF or depth is None:
+                d2 = (((self.points[lo:hi] - point) ** 2) * weights).sum(axis=1)
+                for i in np.flatnonzero(d2 <= r2):
+                    found.append((float(np.sqrt(d2[i])), lo + int(i)))
+                continue
+            mid = (lo + hi) // 2
+            axis = depth % 3
+            pivot = self.points[mid]
+            d2 = (((pivot - point) ** 2) * weights).sum()
+            if d2 <= r2:
+                found.append((float(np.sqrt(d2)), mid))
+            diff = point[axis] - pivot[axis]
+            if diff < 0 or diff * diff * weights[axis] <= r2:
+                stack.append((lo, mid, depth + 1))
+            if diff >= 0 or diff * diff * weights[axis] <= r2:
+                stack.append((mid + 1, hi, depth + 1))
+        return sorted(found)
+
+    def extended(self, triangles):
+        # le nuove righe vanno in coda; l'albero si ricostruisce solo quando la coda supera TAIL_LIMIT
+        triangles = np.asarray(triangles, dtype=float).reshape(-1, 6)
+        if self.tail() + len(triangles) > self.TAIL_LIMIT:
+            return ShapeIndex(np.concatenate([self.triangles, triangles]))
+        return ShapeIndex(np.concatenate([self.triangles, triangles]), np.concatenate([self.points, shape(triangles)]),
+                          ordered=True, indexed=self.indexed)
+
+    @staticmethod
+    def tail_path(path):
+        return os.path.splitext(path)[0] + ".tail.npy"
+
+    def save(self, path):
+        # l'albero nel file .npz, la coda in un file a parte che save_tail riscrive da solo
+        with open(path, "wb") as f:
+            np.savez(f, triangles=self.triangles[:self.indexed], points=self.points[:self.indexed])
+        self.save_tail(path)
+
+    def save_tail(self, path):
+        np.save(self.tail_path(path), self.triangles[self.indexed:])
+
+    @classmethod
+    def load(cls, path):
+        # una libreria nuova può avere solo la coda: il file .npz viene scritto alla prima ricostruzione
+        tail = np.load(cls.tail_path(path)) if os.path.exists(cls.tail_path(path)) else None
+        try:
+            with np.load(path) as data:
+                index = cls(data["triangles"], data["points"], ordered=True)
+        except FileNotFoundError:
+            if tail is None:
+                raise
+            index = cls([])
+        if tail is None:
+            return index
+        return cls(np.concatenate([index.triangles, tail]), np.concatenate([index.points, shape(tail)]),
+                   ordered=True, indexed=index.indexed)
+
+if __name__ == "__main__":
+    # verifica che le aggiunte sopravvivano alla ricarica, con e senza il file .npz
+    import tempfile
+    rows = [[3, 4, 5, 36.87, 53.13, 90], [1, 1, 1, 60, 60, 60], [5, 5, 8, 36.87, 36.87, 106.26]]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "libreria.npz")
+        index = ShapeIndex([])
+        for row in rows:
+            index = index.extended([row])
+            index.save_tail(path)
+            reloaded = ShapeIndex.load(path)
+            assert np.array_equal(reloaded.triangles, index.triangles), "coda persa senza .npz"
+        ShapeIndex(index.triangles).save(path)
+        index = ShapeIndex.load(path).extended([[2, 3, 4, 28.96, 46.57, 104.48]])
+        index.save_tail(path)
+        reloaded = ShapeIndex.load(path)
+        assert len(reloaded) == 4 and reloaded.tail() == 1, "coda persa dopo la ricostruzione"
+        assert reloaded.nearest(rows[1], 1)[0][1] == int(np.flatnonzero((reloaded.triangles == rows[1]).all(axis=1))[0])
+    print("libreria: ricarica ok")
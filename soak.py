@@ -0,0 +1,91 @@
+import sys
+import gc
+import time
+import ctypes
+import argparse
+import resource
+import tracemalloc
+# replay imposta anche la piattaforma senza display
+from replay import editor
+from PyQt5.QtWidgets import QApplication
+import app
+
+def measure():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+def resident():
+    # RSS attuale, non il picco di ru_maxrss: comprende la memoria di Qt che tracemalloc non vede.
+    # prima si restituisce al sistema la memoria libera di malloc, dove possibile
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1])*resource.getpagesize()
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica che la memoria resti piatta su molti tick dello slider")
+    parser.add_argument("--ticks", type=int, default=1000000)
+    parser.add_argument("--checkpoints", type=int, default=20)
+    parser.add_argument("--history", type=int, default=app.History.LIMIT,
+                        help="passi di cronologia; la misura parte quando la cronologia è piena")
+    parser.add_argument("--budget", type=float, default=64, help="crescita massima in KB dopo il riempimento della cronologia")
+    parser.add_argument("--rss-budget", type=float, default=4, help="crescita massima dell'RSS in MB dopo il riempimento della cronologia")
+    options = parser.parse_args()
+    app.History.LIMIT = options.history
+
+    qapp = QApplication(sys.argv[:1])
+    win = app.Window()
+    app.win = win
+    win.show()
+    win.setupPlot()
+    for name in ("a", "b", "c"):
+        win.add_parameter(app.GeometryType.SIDE, name, 5.0)
+    win.resolve_triangle()
+    qapp.processEvents()
+
+    tracemalloc.start()
+    # la cronologia cresce fino a 2*LIMIT passi e poi torna a LIMIT: si misura dopo il primo taglio
+    # e sempre nello stesso punto del ciclo, ogni LIMIT+1 tick
+    period = options.history + 1
+    warmup = 2*period
+    step = period*max(1, (options.ticks - warmup) // (period*options.checkpoints))
+    if options.ticks < warmup + step:
+        parser.error("servono almeno {} tick con --history {}".format(warmup + step, options.history))
+    baseline = None
+    start = time.perf_counter()
+    print("{:>9} {:>12} {:>12} {:>10} {:>12}".format("tick", "memoria KB", "crescita KB", "RSS MB", "crescita MB"))
+    for tick in range(options.ticks):
+        # righe diverse a ogni tick: l'editor della vista viene chiuso e riaperto;
+        # con lati oltre 10 il triangolo diventa impossibile e l'evidenziazione della riga cambia
+        editor(win, tick % 3).slider.setValue(10 + (tick*7) % 111)
+        if tick % 100 == 0:
+            qapp.processEvents()
+        if tick + 1 == warmup:
+            baseline = measure()
+            rss_baseline = resident()
+            first = tracemalloc.take_snapshot()
+        if baseline is not None and (tick + 1 - warmup) % step == 0:
+            current = measure()
+            rss = resident()
+            last = tracemalloc.take_snapshot()
+            print("{:>9} {:>12.1f} {:>12.1f} {:>10.1f} {:>12.1f}".format(
+                tick + 1, current/1024, (current - baseline)/1024, rss/2**20, (rss - rss_baseline)/2**20))
+    growth = (current - baseline)/1024
+    rss_growth = (rss - rss_baseline)/2**20
+    elapsed = time.perf_counter() - start
+    print("{} tick in {:.1f} s, {:.3f} ms per tick".format(options.ticks, elapsed, elapsed*1000/options.ticks))
+    print("cronologia: {} passi, pool item: {}".format(len(win.state.history.steps), len(win.pool)))
+    if growth > options.budget:
+        print("PERDITA: {:.1f} KB dopo il riempimento della cronologia (budget {:.0f} KB)".format(growth, options.budget))
+        for stat in last.compare_to(first, "lineno")[:10]:
+            print(stat)
+        sys.exit(1)
+    if rss_growth > options.rss_budget:
+        # memoria nativa (widget, QPicture, item della scena): tracemalloc non la vede
+        print("PERDITA NATIVA: RSS +{:.1f} MB dopo il riempimento della cronologia (budget {:.0f} MB)".format(rss_growth, options.rss_budget))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+def measure():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, APP, "--startup-report"], env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=60).stdout
+    total = (time.perf_counter() - start)*1000
+    times = dict(line.split() for line in output.splitlines() if line.strip())
+    return float(times["first-frame"]), float(times["plot-ready"]), total
+
+def main():
+    parser = argparse.ArgumentParser(description="Misura il tempo al primo frame di app.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=400, help="budget in ms per il primo frame (mediana)")
+    options = parser.parse_args()
+
+    samples = [measure() for _ in range(options.runs)]
+    first_frame, plot_ready, total = (statistics.median(column) for column in zip(*samples))
+    print("primo frame:     {:.1f} ms".format(first_frame))
+    print("grafico pronto:  {:.1f} ms".format(plot_ready))
+    print("processo intero: {:.1f} ms".format(total))
+    if first_frame > options.budget:
+        print("REGRESSIONE: primo frame oltre il budget di {:.0f} ms".format(options.budget))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()